@@ -1,25 +1,47 @@
-from flask import Flask, render_template_string, request, make_response, jsonify
+from flask import Flask, render_template_string, request, make_response, jsonify, Response, stream_with_context, g
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from google.api_core import exceptions as google_exceptions
 import os
 from dotenv import load_dotenv
 import io
 import sys
 import re
+import ast
+import difflib
 import subprocess
 import tempfile
 import time
 import shutil
 from PIL import Image
 import sqlite3
+import hashlib
+import string
+import threading
+import uuid
+import json
+import base64
+import urllib.parse
+import codecs
+import queue
+import signal
+import selectors
+import multiprocessing
+import random
+import statistics
+import asyncio
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+try:
+    import resource
+except ImportError:
+    resource = None
 
 load_dotenv()
 app = Flask(__name__)
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-# Global state to store the AI's response for download
-fixed_code_result = ""
-explanation_text = ""
+genai.configure(api_key=os.getenv("GEMINI_API_KEY"), transport=os.getenv("GEMINI_TRANSPORT") or None)
 
 def _js_string_filter(s):
     if s is None:
@@ -370,6 +392,70 @@ HTML_TEMPLATE = """
             border-color: var(--accent-blue);
             box-shadow: 0 0 0 2px rgba(0, 201, 255, 0.3);
         }
+        .test-cases {
+            width: 100%;
+            min-height: 90px;
+            padding: 10px 15px;
+            margin-top: 10px;
+            background: var(--bg-card);
+            border: 1px solid var(--border-color);
+            border-radius: 8px;
+            color: var(--text-primary);
+            font-family: 'Source Code Pro', monospace;
+            resize: vertical;
+        }
+        table.test-suite, table.hotspots {
+            width: 100%;
+            border-collapse: collapse;
+        }
+        table.test-suite th, table.test-suite td, table.hotspots th, table.hotspots td {
+            border: 1px solid var(--border-color);
+            padding: 6px 10px;
+            text-align: left;
+            vertical-align: top;
+        }
+        table.test-suite pre {
+            margin: 0;
+            padding: 6px;
+        }
+        table.test-suite .status-pass td:nth-child(2) {
+            color: var(--accent-green);
+        }
+        table.test-suite .status-fail td:nth-child(2),
+        table.test-suite .status-error td:nth-child(2),
+        table.test-suite .status-timeout td:nth-child(2) {
+            color: #ff6b6b;
+        }
+        .live-console pre {
+            max-height: 300px;
+            overflow-y: auto;
+            margin-bottom: 10px;
+        }
+        .live-console .live-stderr {
+            color: #ff6b6b;
+        }
+        .live-console .live-status {
+            color: var(--text-secondary);
+        }
+        .live-console .live-echo {
+            color: var(--accent-blue);
+        }
+        .live-input {
+            display: flex;
+            gap: 10px;
+        }
+        .live-input input[type="text"] {
+            flex: 1;
+        }
+        .benchmark-option {
+            display: block;
+            margin-top: 10px;
+            color: var(--text-secondary);
+        }
+        .benchmark-verdict.regression {
+            color: #ff6b6b;
+            font-weight: bold;
+        }
         .button-group {
             display: flex;
             justify-content: flex-end;
@@ -785,6 +871,14 @@ HTML_TEMPLATE = """
                 <div id="javaMainClassContainer" style="display: none;">
                     <input type="text" name="java_main_class" id="javaMainClassInput" value="{{ java_main_class }}" placeholder="Main class name" />
                 </div>
+                <div id="sqlFixtureContainer" style="display: none;">
+                    <select id="sqlFixtureSelect" title="Adds a -- @fixture line so queries run against a generated customers/products/orders database">
+                        <option value="">No fixture database</option>
+                        <option value="10k">Fixture: 10k orders</option>
+                        <option value="100k">Fixture: 100k orders</option>
+                        <option value="1M">Fixture: 1M orders</option>
+                    </select>
+                </div>
                 <div id="pythonInputPrompts" style="display: none;">
                     {% for prompt in input_prompts %}
                         <input
@@ -795,24 +889,87 @@ HTML_TEMPLATE = """
                         />
                     {% endfor %}
                 </div>
+                <label class="benchmark-option"><input type="checkbox" name="benchmark" value="1" {{ 'checked' if benchmark_requested else '' }} /> Benchmark the original against the fixed code</label>
+                <textarea name="test_cases" class="test-cases" placeholder="Optional test cases: stdin for each case, then a line with --- and the expected output. Separate cases with a line containing ===">{{ test_cases }}</textarea>
                 <div class="button-group">
                     <button class="button debug" type="submit" id="debugButton">Debug Code</button>
-                    <a href="/download" class="button download">Download</a>
+                    <button class="button download" type="button" id="liveRunButton">Run Live</button>
+                    <button class="button download" type="button" id="profileButton">Profile &amp; Speed Up</button>
+                    <a href="/download?id={{ result_id }}" class="button download" id="downloadLink">Download</a>
+                </div>
+                <div class="live-console" id="liveConsole" style="display: none;">
+                    <h3>Live Output</h3>
+                    <pre id="liveOutput"></pre>
+                    <div class="live-input">
+                        <input type="text" id="liveInput" placeholder="Input for the running program, sent on Enter" />
+                        <button class="button download" type="button" id="liveCancelButton">Stop</button>
+                    </div>
                 </div>
             </div>
-            <div class="output-panel">
+            <div class="output-panel" id="outputPanel">
                 {% if result %}
                     <h3>Fixed Code</h3>
                     <pre>{{ result }}</pre>
                 {% endif %}
+                {% if diff %}
+                    <h3>Changes</h3>
+                    <pre>{{ diff }}</pre>
+                {% endif %}
                 {% if explanation %}
                     <h3>Explanation</h3>
                     <pre>{{ explanation }}</pre>
                 {% endif %}
+                {% if original_output %}
+                    <h3>Original Code Output</h3>
+                    <div class="execution-output">{{ original_output }}</div>
+                {% endif %}
                 {% if output %}
                     <h3>Execution Output</h3>
                     <div class="execution-output">{{ output }}</div>
                 {% endif %}
+                {% if benchmark %}
+                    <h3>Benchmark</h3>
+                    {% if benchmark.error %}
+                        <div class="execution-output">{{ benchmark.error }}</div>
+                    {% else %}
+                        <p class="benchmark-verdict {{ 'regression' if benchmark.comparison.regression else '' }}">
+                            {{ benchmark.comparison.verdict | capitalize }}: {{ '%+.1f' | format(benchmark.comparison.relative_change * 100) }}% mean time
+                            ({{ benchmark.comparison.delta_ms }} ms, noise ±{{ benchmark.comparison.noise_ms }} ms){% if not benchmark.outputs_match %}; outputs differ{% endif %}{% if benchmark.budget_exhausted %}; stopped after {{ benchmark.original.runs }} runs (time budget){% endif %}
+                        </p>
+                        <table class="hotspots">
+                            <tr><th></th><th>Mean (ms)</th><th>Std dev (ms)</th><th>Min (ms)</th><th>Peak memory (KB)</th></tr>
+                            {% for label in ['original', 'fixed'] %}
+                                <tr>
+                                    <td>{{ label | capitalize }}</td>
+                                    <td>{{ benchmark[label].mean_ms }}</td>
+                                    <td>{{ benchmark[label].stddev_ms }}</td>
+                                    <td>{{ benchmark[label].min_ms }}</td>
+                                    <td>{{ benchmark[label].peak_memory_kb if benchmark[label].peak_memory_kb is not none else '' }}</td>
+                                </tr>
+                            {% endfor %}
+                        </table>
+                    {% endif %}
+                {% endif %}
+                {% if test_suite %}
+                    <h3>Test Cases</h3>
+                    {% if test_suite.error %}
+                        <div class="execution-output">{{ test_suite.error }}</div>
+                    {% else %}
+                        <p>{{ test_suite.passed }} passed, {{ test_suite.failed }} failed of {{ test_suite.total }} (build {{ test_suite.build_ms }} ms)</p>
+                        <table class="test-suite">
+                            <tr><th>Case</th><th>Status</th><th>Time (ms)</th><th>Output</th><th>Expected</th></tr>
+                            {% for case in test_suite.cases %}
+                                <tr class="status-{{ case.status }}">
+                                    <td>{{ case.name }}</td>
+                                    <td>{{ case.status }}</td>
+                                    <td>{{ case.time_ms }}</td>
+                                    <td><pre>{{ case.output or case.error }}</pre></td>
+                                    <td><pre>{{ case.expected if case.expected is not none else '' }}</pre></td>
+                                </tr>
+                            {% endfor %}
+                        </table>
+                    {% endif %}
+                {% endif %}
             </div>
         </div>
     </form>
@@ -843,26 +1000,7 @@ HTML_TEMPLATE = """
     <i class="fas fa-comment-dots"></i>
 </button>
 <script>
-    const languageMode = {
-        python: "python",
-        java: "text/x-java",
-        cpp: "text/x-c++src",
-        go: "go",
-        rust: "rust",
-        ruby: "ruby",
-        kotlin: "text/x-java",
-        javascript: "javascript",
-        typescript: "javascript",
-        html: "text/html",
-        css: "text/css",
-        django: "python",
-        react: "javascript",
-        arduino: "text/x-c++src",
-        verilog: "verilog",
-        systemverilog: "verilog",
-        uvm: "verilog",
-        sql: "text/x-sql",
-    };
+    const languageMode = {{ language_modes | tojson }};
     let editorInstance;
     let currentLanguage;
     let debugForm;
@@ -882,6 +1020,8 @@ HTML_TEMPLATE = """
     let imagePreview;
     let removeImageBtn;
     let selectedImageFile = null;
+    let liveRunButton;
+    let liveRunId = null;
     function initializeElements() {
         debugForm = document.querySelector("form");
         debugButton = document.getElementById("debugButton");
@@ -899,6 +1039,7 @@ HTML_TEMPLATE = """
         imagePreviewContainer = document.getElementById('imagePreviewContainer');
         imagePreview = document.getElementById('imagePreview');
         removeImageBtn = document.getElementById('removeImageBtn');
+        liveRunButton = document.getElementById('liveRunButton');
     }
     function initializeCodeMirror(initialLanguage, initialCode) {
         console.log("Initializing CodeMirror with mode:", initialLanguage);
@@ -938,12 +1079,23 @@ HTML_TEMPLATE = """
         if (javaMainClassContainer) {
             javaMainClassContainer.style.display = (lang === 'java' || lang === 'kotlin') ? 'block' : 'none';
         }
+        const sqlFixtureContainer = document.getElementById('sqlFixtureContainer');
+        if (sqlFixtureContainer) {
+            sqlFixtureContainer.style.display = lang === 'sql' ? 'block' : 'none';
+        }
         if (pythonInputPromptsContainer) {
             const showPythonPrompts = ['python', 'django'].includes(lang);
             pythonInputPromptsContainer.style.display = showPythonPrompts ? 'block' : 'none';
         }
         updateChatbotVisibility(true);
     }
+    function setSqlFixture(size) {
+        if (!editorInstance) return;
+        const directive = /^[ \\t]*--[ \\t]*@fixture.*(\\n|$)/m;
+        let code = editorInstance.getValue().replace(directive, '');
+        if (size) code = `-- @fixture ${size}\\n${code}`;
+        editorInstance.setValue(code);
+    }
     function showDebugger() {
         console.log("showDebugger() called.");
         const welcomeScreen = document.getElementById("welcomeScreen");
@@ -1092,6 +1244,289 @@ HTML_TEMPLATE = """
             icon.classList.add('fa-moon');
         }
     }
+    function resetDebugButton() {
+        if (debugButton) {
+            debugButton.classList.remove('loading');
+            debugButton.innerHTML = 'Debug Code';
+            debugButton.disabled = false;
+        }
+    }
+    function ensureOutputSection(id, title, tagName, className) {
+        const outputPanel = document.getElementById('outputPanel');
+        let body = document.getElementById(id);
+        if (!body) {
+            const heading = document.createElement('h3');
+            heading.textContent = title;
+            body = document.createElement(tagName);
+            body.id = id;
+            if (className) body.classList.add(className);
+            outputPanel.appendChild(heading);
+            outputPanel.appendChild(body);
+        }
+        return body;
+    }
+    function renderTestSuite(container, suite) {
+        container.innerHTML = '';
+        if (suite.error) {
+            const error = document.createElement('div');
+            error.className = 'execution-output';
+            error.textContent = suite.error;
+            container.appendChild(error);
+            return;
+        }
+        const summary = document.createElement('p');
+        summary.textContent = `${suite.passed} passed, ${suite.failed} failed of ${suite.total} (build ${suite.build_ms} ms)`;
+        const table = document.createElement('table');
+        table.className = 'test-suite';
+        const header = table.insertRow();
+        ['Case', 'Status', 'Time (ms)', 'Output', 'Expected'].forEach(title => {
+            const th = document.createElement('th');
+            th.textContent = title;
+            header.appendChild(th);
+        });
+        suite.cases.forEach(testCase => {
+            const row = table.insertRow();
+            row.className = `status-${testCase.status}`;
+            [testCase.name, testCase.status, testCase.time_ms].forEach(value => {
+                row.insertCell().textContent = value;
+            });
+            [testCase.output || testCase.error, testCase.expected === null ? '' : testCase.expected].forEach(value => {
+                const pre = document.createElement('pre');
+                pre.textContent = value;
+                row.insertCell().appendChild(pre);
+            });
+        });
+        container.appendChild(summary);
+        container.appendChild(table);
+    }
+    async function readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\\n\\n')) !== -1) {
+                let event = 'message';
+                let data = '';
+                buffer.slice(0, boundary).split('\\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                buffer = buffer.slice(boundary + 2);
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+    function renderProfile(container, report) {
+        container.innerHTML = '';
+        if (report.error) {
+            const error = document.createElement('div');
+            error.className = 'execution-output';
+            error.textContent = report.error;
+            container.appendChild(error);
+            return;
+        }
+        const stats = [`${report.tool}`, `wall ${report.wall_ms} ms`];
+        if (report.cpu_ms !== null) stats.push(`CPU ${report.cpu_ms} ms`);
+        if (report.peak_memory_kb !== null) stats.push(`peak memory ${report.peak_memory_kb} KB`);
+        if (report.python_heap_peak_kb !== undefined) stats.push(`Python heap ${report.python_heap_peak_kb} KB`);
+        Object.entries(report.counters || {}).forEach(([name, value]) => stats.push(`${name} ${value}`));
+        const summary = document.createElement('p');
+        summary.textContent = stats.join(' · ');
+        container.appendChild(summary);
+        if (report.hotspots.length) {
+            const table = document.createElement('table');
+            table.className = 'hotspots';
+            const header = table.insertRow();
+            ['Function', 'Self (ms)', 'Total (ms)', 'Calls'].forEach(title => {
+                const th = document.createElement('th');
+                th.textContent = title;
+                header.appendChild(th);
+            });
+            report.hotspots.forEach(hotspot => {
+                const row = table.insertRow();
+                [hotspot.name, hotspot.self_ms, hotspot.total_ms, hotspot.calls].forEach(value => {
+                    row.insertCell().textContent = value === null ? '' : value;
+                });
+            });
+            container.appendChild(table);
+        }
+        const output = document.createElement('div');
+        output.className = 'execution-output';
+        output.textContent = report.output + (report.stderr ? `\\n${report.stderr}` : '');
+        container.appendChild(output);
+    }
+    async function profileAndOptimize() {
+        const profileButton = document.getElementById('profileButton');
+        const formData = new FormData(debugForm);
+        const testInputs = [];
+        for (const [name, value] of formData.entries()) {
+            if (name.startsWith('test_input_')) testInputs.push(value);
+        }
+        profileButton.disabled = true;
+        document.getElementById('outputPanel').innerHTML = '';
+        try {
+            const response = await fetch('/api/profile', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    language: currentLanguage,
+                    code: editorInstance ? editorInstance.getValue() : formData.get('code'),
+                    java_main_class: formData.get('java_main_class'),
+                    test_inputs: testInputs
+                })
+            });
+            const result = await response.json();
+            if (result.profile) {
+                renderProfile(ensureOutputSection('profileReport', 'Profile', 'div'), result.profile);
+            }
+            if (result.fixed_code) {
+                handleStreamEvent('result', { id: result.id, fixed_code: result.fixed_code,
+                                              explanation: result.explanation, diff: result.diff });
+            } else if (result.error) {
+                ensureOutputSection('profileError', 'Error', 'div', 'execution-output').textContent = result.error;
+            }
+        } catch (error) {
+            console.error('Profiling failed:', error);
+        } finally {
+            profileButton.disabled = false;
+        }
+    }
+    function renderBenchmark(container, report) {
+        container.innerHTML = '';
+        if (report.error) {
+            const error = document.createElement('div');
+            error.className = 'execution-output';
+            error.textContent = report.error;
+            container.appendChild(error);
+            return;
+        }
+        const comparison = report.comparison;
+        const verdict = document.createElement('p');
+        verdict.className = 'benchmark-verdict';
+        if (comparison.regression) verdict.classList.add('regression');
+        const change = (comparison.relative_change * 100).toFixed(1);
+        verdict.textContent = `${comparison.verdict.charAt(0).toUpperCase()}${comparison.verdict.slice(1)}: ` +
+            `${comparison.relative_change >= 0 ? '+' : ''}${change}% mean time ` +
+            `(${comparison.delta_ms} ms, noise ±${comparison.noise_ms} ms)` +
+            (report.outputs_match ? '' : '; outputs differ') +
+            (report.budget_exhausted ? `; stopped after ${report.original.runs} runs (time budget)` : '');
+        const table = document.createElement('table');
+        table.className = 'hotspots';
+        const header = table.insertRow();
+        ['', 'Mean (ms)', 'Std dev (ms)', 'Min (ms)', 'Peak memory (KB)'].forEach(title => {
+            const th = document.createElement('th');
+            th.textContent = title;
+            header.appendChild(th);
+        });
+        ['original', 'fixed'].forEach(label => {
+            const stats = report[label];
+            const row = table.insertRow();
+            [label.charAt(0).toUpperCase() + label.slice(1), stats.mean_ms, stats.stddev_ms, stats.min_ms,
+             stats.peak_memory_kb === null ? '' : stats.peak_memory_kb].forEach(value => {
+                row.insertCell().textContent = value;
+            });
+        });
+        container.appendChild(verdict);
+        container.appendChild(table);
+    }
+    function handleStreamEvent(event, payload) {
+        if (event === 'code') {
+            ensureOutputSection('streamFixedCode', 'Fixed Code', 'pre').textContent += payload;
+        } else if (event === 'explanation') {
+            ensureOutputSection('streamExplanation', 'Explanation', 'pre').textContent += payload;
+        } else if (event === 'result') {
+            ensureOutputSection('streamFixedCode', 'Fixed Code', 'pre').textContent = payload.fixed_code;
+            ensureOutputSection('streamExplanation', 'Explanation', 'pre').textContent = payload.explanation;
+            if (payload.diff) {
+                ensureOutputSection('streamDiff', 'Changes', 'pre').textContent = payload.diff;
+            }
+            document.getElementById('downloadLink').href = `/download?id=${payload.id}`;
+        } else if (event === 'original_output') {
+            ensureOutputSection('streamOriginalOutput', 'Original Code Output', 'div', 'execution-output').textContent = payload;
+        } else if (event === 'output') {
+            ensureOutputSection('streamOutput', 'Execution Output', 'div', 'execution-output').textContent = payload;
+        } else if (event === 'benchmark') {
+            renderBenchmark(ensureOutputSection('streamBenchmark', 'Benchmark', 'div'), payload);
+        } else if (event === 'test_suite') {
+            renderTestSuite(ensureOutputSection('streamTestSuite', 'Test Cases', 'div'), payload);
+        } else if (event === 'error') {
+            console.error('Streaming fix failed:', payload);
+        }
+    }
+    async function streamDebug() {
+        const response = await fetch('/stream_fix', { method: 'POST', body: new FormData(debugForm) });
+        if (!response.ok || !response.body) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        document.getElementById('outputPanel').innerHTML = '';
+        await readEventStream(response, handleStreamEvent);
+    }
+    function appendLiveOutput(text, className) {
+        const output = document.getElementById('liveOutput');
+        const span = document.createElement('span');
+        if (className) span.className = className;
+        span.textContent = text;
+        output.appendChild(span);
+        output.scrollTop = output.scrollHeight;
+    }
+    function handleLiveEvent(event, payload) {
+        if (event === 'session') {
+            liveRunId = payload.id;
+        } else if (event === 'stage') {
+            appendLiveOutput(`[${payload}]\\n`, 'live-status');
+        } else if (event === 'stdout') {
+            appendLiveOutput(payload);
+        } else if (event === 'stderr' || event === 'error') {
+            appendLiveOutput(event === 'error' ? `${payload}\\n` : payload, 'live-stderr');
+        } else if (event === 'exit') {
+            if (payload.message) appendLiveOutput(`${payload.message}\\n`, 'live-stderr');
+            appendLiveOutput(`[exited with code ${payload.returncode} after ${payload.elapsed_ms} ms]\\n`, 'live-status');
+        }
+    }
+    async function runLive() {
+        if (liveRunId || !liveRunButton) return;
+        if (editorInstance) {
+            document.getElementById("codeInput").value = editorInstance.getValue();
+        }
+        document.getElementById('liveConsole').style.display = 'block';
+        document.getElementById('liveOutput').textContent = '';
+        liveRunButton.disabled = true;
+        try {
+            const response = await fetch('/run_live', { method: 'POST', body: new FormData(debugForm) });
+            if (!response.ok || !response.body) {
+                const body = await response.json().catch(() => ({}));
+                appendLiveOutput(`${body.error || `HTTP error! status: ${response.status}`}\\n`, 'live-stderr');
+                return;
+            }
+            await readEventStream(response, handleLiveEvent);
+        } catch (error) {
+            appendLiveOutput(`${error}\\n`, 'live-stderr');
+        } finally {
+            liveRunId = null;
+            liveRunButton.disabled = false;
+        }
+    }
+    function sendLiveInput() {
+        const liveInput = document.getElementById('liveInput');
+        if (!liveRunId) return;
+        const text = `${liveInput.value}\\n`;
+        liveInput.value = '';
+        appendLiveOutput(text, 'live-echo');
+        fetch(`/run_live/${liveRunId}/stdin`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ data: text })
+        }).catch(error => console.error('Sending input failed:', error));
+    }
+    function cancelLiveRun() {
+        if (!liveRunId) return;
+        fetch(`/run_live/${liveRunId}/cancel`, { method: 'POST' })
+            .catch(error => console.error('Cancelling the run failed:', error));
+    }
     document.addEventListener('DOMContentLoaded', function () {
         console.log("DOMContentLoaded fired.");
         initializeElements();
@@ -1114,6 +1549,32 @@ HTML_TEMPLATE = """
                 if (editorInstance) {
                     document.getElementById("codeInput").value = editorInstance.getValue();
                 }
+                if (window.fetch && window.ReadableStream && window.TextDecoder) {
+                    event.preventDefault();
+                    streamDebug().catch(error => {
+                        console.error('Streaming failed, falling back to full page submit:', error);
+                        debugForm.submit();
+                    }).then(resetDebugButton);
+                }
+            });
+        }
+        const sqlFixtureSelect = document.getElementById('sqlFixtureSelect');
+        if (sqlFixtureSelect) {
+            const directive = (editorInstance ? editorInstance.getValue() : '').match(/^[ \\t]*--[ \\t]*@fixture[ \\t]+(?:rows[ \\t]*=[ \\t]*)?(\\S+)/m);
+            if (directive) sqlFixtureSelect.value = directive[1];
+            sqlFixtureSelect.addEventListener('change', () => setSqlFixture(sqlFixtureSelect.value));
+        }
+        if (document.getElementById('profileButton')) {
+            document.getElementById('profileButton').addEventListener('click', profileAndOptimize);
+        }
+        if (liveRunButton) {
+            liveRunButton.addEventListener('click', runLive);
+            document.getElementById('liveCancelButton').addEventListener('click', cancelLiveRun);
+            document.getElementById('liveInput').addEventListener('keypress', function (e) {
+                if (e.key === 'Enter') {
+                    e.preventDefault();
+                    sendLiveInput();
+                }
             });
         }
         if (languageTabs) {
@@ -1151,11 +1612,7 @@ HTML_TEMPLATE = """
         if (removeImageBtn) {
             removeImageBtn.addEventListener('click', removeImage);
         }
-        if (debugButton) {
-            debugButton.classList.remove('loading');
-            debugButton.innerHTML = 'Debug Code';
-            debugButton.disabled = false;
-        }
+        resetDebugButton();
         if (document.getElementById('debuggerContainer').style.display !== 'none') {
             updateChatbotVisibility(true);
         } else {
@@ -1167,558 +1624,3612 @@ HTML_TEMPLATE = """
 </html>
 """
 
-def _gemini_api_call_with_retries(func, *args, max_retries=5, initial_delay=1, **kwargs):
-    delay = initial_delay
-    for i in range(max_retries):
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=METRIC_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', bound)])} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', '+Inf')])} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series['count']}")
+        return lines
+
+request_duration = Histogram("ai_debugger_request_duration_seconds", "HTTP request latency by endpoint.", ("endpoint",))
+stage_duration = Histogram("ai_debugger_stage_duration_seconds", "Time spent in each processing stage.", ("stage", "language"))
+gemini_retries = Counter("ai_debugger_gemini_retries_total", "Gemini calls retried after a failed attempt.", ("operation",))
+gemini_failures = Counter("ai_debugger_gemini_failures_total", "Gemini calls that failed, after any retries.", ("operation",))
+execution_timeouts = Counter("ai_debugger_execution_timeouts_total", "Code executions that timed out.", ("language",))
+execution_errors = Counter("ai_debugger_execution_errors_total", "Code executions that ended in an error.", ("language",))
+METRICS = [request_duration, stage_duration, gemini_retries, gemini_failures, execution_timeouts, execution_errors]
+
+_timings_local = threading.local()
+
+METRIC_EXTRA_LANGUAGES = ("all", "chat")
+
+def metric_language(language):
+    # Form values are user-controlled, so keep label cardinality bounded to known languages.
+    language = language or "all"
+    return language if language in LANGUAGES or language in METRIC_EXTRA_LANGUAGES else "other"
+
+def record_timing(stage, seconds, language=""):
+    stage_duration.observe(seconds, stage=stage, language=metric_language(language))
+    timings = getattr(_timings_local, "timings", None)
+    if timings is not None:
+        timings.append((stage, seconds))
+
+@contextmanager
+def timed(stage, language=""):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, time.perf_counter() - started, language)
+
+def record_execution_outcome(language, output):
+    if not output or not output.startswith("❌"):
+        return
+    if "timed out" in output:
+        execution_timeouts.inc(language=metric_language(language))
+    else:
+        execution_errors.inc(language=metric_language(language))
+
+def server_timing_header(timings):
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
+
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 5))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", 0.5))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", 8))
+GEMINI_REQUEST_BUDGET = float(os.getenv("GEMINI_REQUEST_BUDGET", 30))
+GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5))
+GEMINI_BREAKER_RESET = float(os.getenv("GEMINI_BREAKER_RESET", 30))
+RETRYABLE_EXCEPTIONS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ServiceUnavailable,
+    TimeoutError,
+    ConnectionError,
+)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+gemini_circuit_rejections = Counter("ai_debugger_gemini_circuit_rejections_total",
+                                    "Gemini calls rejected while the circuit breaker was open.", ("operation",))
+METRICS.append(gemini_circuit_rejections)
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._probing):
+                raise CircuitOpenError("Gemini is temporarily unavailable. Please try again shortly.")
+            if state == "half-open":
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        with self._lock:
+            self._probing = False
+
+gemini_breaker = CircuitBreaker(GEMINI_BREAKER_THRESHOLD, GEMINI_BREAKER_RESET)
+
+def is_retryable_error(error):
+    if isinstance(error, RETRYABLE_EXCEPTIONS):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+def backoff_delay(attempt, base_delay=GEMINI_RETRY_BASE_DELAY, max_delay=GEMINI_RETRY_MAX_DELAY):
+    # Full jitter: a uniform delay between zero and the capped exponential backoff.
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+class _RetryPlan:
+    def __init__(self, func, max_retries, base_delay, budget):
+        self.operation = getattr(func, "__name__", "call")
+        # max_retries counts attempts, so even 0 still makes the one call the caller asked for.
+        self.max_retries = max(max_retries, 1)
+        self.base_delay = base_delay
+        self.deadline = time.monotonic() + budget
+
+    def start_attempt(self, kwargs):
+        try:
+            gemini_breaker.before_call()
+        except CircuitOpenError:
+            gemini_circuit_rejections.inc(operation=self.operation)
+            raise
+        remaining = self.deadline - time.monotonic()
+        kwargs.setdefault("request_options", {"timeout": max(remaining, 1)})
+
+    def next_delay(self, attempt, error):
+        if not is_retryable_error(error):
+            gemini_breaker.release()
+            gemini_failures.inc(operation=self.operation)
+            return None
+        gemini_breaker.record_failure()
+        delay = backoff_delay(attempt, self.base_delay)
+        if attempt + 1 >= self.max_retries or time.monotonic() + delay >= self.deadline:
+            gemini_failures.inc(operation=self.operation)
+            raise Exception(f"Failed after {attempt + 1} attempts: {error}") from error
+        print(f"Attempt {attempt + 1}/{self.max_retries} failed: {error}. Retrying in {delay:.2f} seconds...")
+        gemini_retries.inc(operation=self.operation)
+        return delay
+
+def _gemini_api_call_with_retries(func, *args, max_retries=GEMINI_MAX_RETRIES, initial_delay=GEMINI_RETRY_BASE_DELAY,
+                                  budget=GEMINI_REQUEST_BUDGET, **kwargs):
+    plan = _RetryPlan(func, max_retries, initial_delay, budget)
+    for attempt in range(plan.max_retries):
+        call_kwargs = dict(kwargs)
+        plan.start_attempt(call_kwargs)
         try:
-            return func(*args, **kwargs)
+            result = func(*args, **call_kwargs)
         except Exception as e:
-            print(f"Attempt {i+1}/{max_retries} failed: {e}. Retrying in {delay:.2f} seconds...")
+            delay = plan.next_delay(attempt, e)
+            if delay is None:
+                raise
             time.sleep(delay)
-            delay *= 2
-    raise Exception(f"Failed after {max_retries} retries.")
-
-def preprocess_code(code):
-    code = re.sub(r'```(python|java|cpp|go|rust|ruby|kotlin|arduino|verilog|systemverilog|uvm|javascript|typescript|html|css|django|react|sql)\s*', '', code, flags=re.IGNORECASE)
-    code = code.replace("```", "")
-    code = code.replace("\t", "    ")
-    code = re.sub(r'[^\x00-\x7F]+', '', code)
-    code = re.sub(r'^\s*\.\.\..*$', '', code, flags=re.MULTILINE)
+        else:
+            gemini_breaker.record_success()
+            return result
+
+async def gemini_api_call_with_retries_async(func, *args, max_retries=GEMINI_MAX_RETRIES,
+                                             initial_delay=GEMINI_RETRY_BASE_DELAY, budget=GEMINI_REQUEST_BUDGET, **kwargs):
+    plan = _RetryPlan(func, max_retries, initial_delay, budget)
+    for attempt in range(plan.max_retries):
+        call_kwargs = dict(kwargs)
+        plan.start_attempt(call_kwargs)
+        try:
+            result = await func(*args, **call_kwargs)
+        except Exception as e:
+            delay = plan.next_delay(attempt, e)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+        else:
+            gemini_breaker.record_success()
+            return result
+
+FENCE_OPENING = re.compile(r'```[\w+#.-]*[ \t]*\n?')
+SPECIAL_CHARS = "\u00a0\u200b-\u200d\ufeff\u2018\u2019\u201c\u201d"
+# The lookahead lets the scanner skip ordinary characters without trying every branch.
+NORMALIZE_PASS = re.compile(
+    r'(?=["\'`\n\t' + SPECIAL_CHARS + r'])(?:'
+    r'(?P<literal>"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+    r'|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\'|`[^`\\]*(?:\\.[^`\\]*)*`)'
+    r'|(?P<placeholder>\n[ \t]*\.\.\.[ \t]+\S[^\n]*)'
+    r'|(?P<tab>\t)'
+    r'|(?P<char>[' + SPECIAL_CHARS + r']))')
+NEEDS_NORMALIZING = re.compile(r'\t|\.\.\.|[' + SPECIAL_CHARS + r']')
+CHAR_REPLACEMENTS = {"\u00a0": " ", "\u200b": "", "\u200c": "", "\u200d": "", "\ufeff": "",
+                     "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"'}
+
+def _normalize_match(match):
+    kind = match.lastgroup
+    if kind == "literal":
+        return match.group()
+    if kind == "placeholder":
+        return "\n"
+    if kind == "tab":
+        return "    "
+    return CHAR_REPLACEMENTS[match.group()]
+
+def extract_fenced_blocks(code):
+    blocks = []
+    position = code.find("```")
+    while position != -1:
+        start = FENCE_OPENING.match(code, position).end()
+        end = code.find("```", start)
+        blocks.append(code[start:end if end != -1 else len(code)].strip("\n"))
+        position = code.find("```", end + 3) if end != -1 else -1
+    return "\n\n".join(blocks)
+
+def preprocess_code(code, clean=False):
+    if clean:
+        return code.strip()
+    if "```" in code:
+        code = extract_fenced_blocks(code)
+    if NEEDS_NORMALIZING.search(code):
+        code = NORMALIZE_PASS.sub(_normalize_match, "\n" + code)
     return code.strip()
 
-def get_input_prompts(code):
+INPUT_CALL_FALLBACK = re.compile(r'input\s*\((.*?)\)')
+
+@lru_cache(maxsize=256)
+def find_input_calls(code):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        # Buggy code often does not parse; fall back to a plain scan so the form still offers inputs.
+        return tuple(match.group(1).strip().strip('"\'') or "Enter value" for match in INPUT_CALL_FALLBACK.finditer(code))
+    calls = sorted((node for node in ast.walk(tree)
+                    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "input"),
+                   key=lambda node: (node.lineno, node.col_offset))
     prompts = []
-    matches = list(re.finditer(r'input\s*\((.*?)\)', code))
-    for match in matches:
-        try:
-            prompt = match.group(1).strip().strip('"\'') or "Enter value"
-        except:
-            prompt = "Enter value"
-        prompts.append(prompt)
-    return prompts
+    for call in calls:
+        prompt = call.args[0] if call.args else None
+        if isinstance(prompt, ast.Constant) and isinstance(prompt.value, str):
+            prompts.append(prompt.value.strip() or "Enter value")
+        elif prompt is not None:
+            prompts.append(ast.unparse(prompt))
+        else:
+            prompts.append("Enter value")
+    return tuple(prompts)
+
+def get_input_prompts(code):
+    return list(find_input_calls(code))
 
 def requires_test_input(code):
-    patterns = [r'input\s*\(', r'int\s*\(\s*input\s*\(', r'float\s*\(\s*input\s*\(']
-    return any(re.search(p, code) for p in patterns)
+    return bool(find_input_calls(code))
 
-def fix_code_with_gemini(code, language):
-    global fixed_code_result, explanation_text
-    try:
-        model = genai.GenerativeModel("gemini-1.5-flash",
-                                     safety_settings={
-                                         HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                                         HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                                         HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                                         HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                                     })
-        chat = model.start_chat()
-        prompt = ""
-        if language == "java":
-            class_match = re.search(r'public\s+class\s+(\w+)', code)
-            main_class = class_match.group(1) if class_match else "Main"
-            prompt = f"""Fix this Java code:
-{code}
-Requirements:
-1. Include main class '{main_class}'
-2. Add necessary imports and fix syntax errors.
-3. Ensure the code is runnable.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language == "cpp":
-            prompt = f"""Fix this C++ code:
+FIX_CACHE_PATH = os.getenv("FIX_CACHE_PATH", "fix_cache.db")
+FIX_CACHE_MAX_ENTRIES = int(os.getenv("FIX_CACHE_MAX_ENTRIES", 5000))
+FIX_CACHE_TTL = int(os.getenv("FIX_CACHE_TTL", 7 * 24 * 3600))
+
+class FixCache:
+    def __init__(self, path, max_entries, ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fix_cache ("
+            "key TEXT PRIMARY KEY, fixed_code TEXT NOT NULL, explanation TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fix_cache_last_access ON fix_cache (last_access)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fixed_code, explanation, created_at FROM fix_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM fix_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE fix_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0], row[1]
+
+    def put(self, key, fixed_code, explanation):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fix_cache (key, fixed_code, explanation, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, fixed_code, explanation, now, now),
+            )
+            expired = self._conn.execute("DELETE FROM fix_cache WHERE created_at < ?", (now - self.ttl,)).rowcount
+            overflow = self._conn.execute("SELECT COUNT(*) FROM fix_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM fix_cache WHERE key IN "
+                    "(SELECT key FROM fix_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+            self.evictions += expired + max(overflow, 0)
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM fix_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+fix_cache = FixCache(FIX_CACHE_PATH, FIX_CACHE_MAX_ENTRIES, FIX_CACHE_TTL)
+
+def normalize_code_for_cache(code):
+    code = code.replace("\r\n", "\n").replace("\r", "\n").replace("\t", "    ")
+    return "\n".join(line.rstrip() for line in code.strip().split("\n"))
+
+def fix_cache_key(code, language):
+    payload = "\0".join([get_language(language).template.version, "normalized", language, normalize_code_for_cache(code)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+coalesced_requests = Counter("ai_debugger_coalesced_requests_total",
+                              "Requests that waited on an identical in-flight call instead of starting their own.",
+                              ("kind",))
+METRICS.append(coalesced_requests)
+SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", 120))
+
+class FlightWaitTimeout(Exception):
+    pass
+
+class _FlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise FlightWaitTimeout()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class SingleFlight:
+    def __init__(self, kind):
+        self.kind = kind
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                coalesced_requests.inc(kind=self.kind)
+                return call, False
+            call = self._calls[key] = _FlightCall()
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def follow(self, call, func):
+        report_stage("waiting")
+        try:
+            return call.wait(SINGLE_FLIGHT_WAIT_TIMEOUT)
+        except FlightWaitTimeout:
+            # The leader is stuck or very slow; do the work here rather than hang with it.
+            print(f"Coalesced {self.kind} call waited {SINGLE_FLIGHT_WAIT_TIMEOUT}s, running it directly.")
+            return func()
+        finally:
+            _finish_stage()
+
+    def do(self, key, func):
+        call, leader = self.begin(key)
+        if not leader:
+            return self.follow(call, func)
+        try:
+            result = func()
+        except Exception as e:
+            self.finish(key, call, error=e)
+            raise
+        except BaseException:
+            self.finish(key, call, error=Exception("The original request was cancelled."))
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+fix_flight = SingleFlight("fix")
+
+RESULT_STORE_BACKEND = os.getenv("RESULT_STORE_BACKEND", "sqlite")
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", "results.db")
+RESULT_STORE_MAX_ENTRIES = int(os.getenv("RESULT_STORE_MAX_ENTRIES", 1000))
+RESULT_STORE_TTL = int(os.getenv("RESULT_STORE_TTL", 24 * 3600))
+
+class MemoryResultStore:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, result):
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self._items[result_id] = (time.time(), result)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return result_id
+
+    def get(self, result_id):
+        with self._lock:
+            item = self._items.get(result_id)
+            if item is None:
+                return None
+            if time.time() - item[0] > self.ttl:
+                del self._items[result_id]
+                return None
+            self._items.move_to_end(result_id)
+            return item[1]
+
+class SqliteResultStore:
+    def __init__(self, path, max_entries, ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id TEXT PRIMARY KEY, language TEXT NOT NULL, fixed_code TEXT NOT NULL, "
+            "explanation TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)")
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, result):
+        result_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO results (id, language, fixed_code, explanation, created_at) VALUES (?, ?, ?, ?, ?)",
+                (result_id, result["language"], result["fixed_code"], result["explanation"], now),
+            )
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM results WHERE id IN "
+                "(SELECT id FROM results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        return result_id
+
+    def get(self, result_id):
+        row = self._connect().execute(
+            "SELECT language, fixed_code, explanation, created_at FROM results WHERE id = ?", (result_id,)
+        ).fetchone()
+        if row is None or time.time() - row[3] > self.ttl:
+            return None
+        return {"language": row[0], "fixed_code": row[1], "explanation": row[2]}
+
+if RESULT_STORE_BACKEND == "memory":
+    result_store = MemoryResultStore(RESULT_STORE_MAX_ENTRIES, RESULT_STORE_TTL)
+else:
+    result_store = SqliteResultStore(RESULT_STORE_PATH, RESULT_STORE_MAX_ENTRIES, RESULT_STORE_TTL)
+
+FIX_MODEL_NAME = os.getenv("FIX_MODEL_NAME", "gemini-1.5-flash")
+CHAT_MODEL_NAME = os.getenv("CHAT_MODEL_NAME", "gemini-1.5-flash")
+EXPLANATION_MARKER = "---EXPLANATION---"
+GEMINI_SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+class ModelRegistry:
+    def __init__(self, roles):
+        self.roles = roles
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, role):
+        name = self.roles[role]
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    model = genai.GenerativeModel(name, safety_settings=GEMINI_SAFETY_SETTINGS)
+                    self._models[name] = model
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+model_registry = ModelRegistry({"fix": FIX_MODEL_NAME, "chat": CHAT_MODEL_NAME})
+
+def build_fix_prompt(code, language):
+    entry = get_language(language)
+    return entry.template.render(code=code, language=language, **entry.prompt_values(code))
+
+def split_fix_response(full):
+    full = full.strip()
+    if EXPLANATION_MARKER in full:
+        fixed_code, explanation = map(str.strip, full.split(EXPLANATION_MARKER, 1))
+        return fixed_code, explanation
+    return full, "Explanation not provided by AI."
+
+DIFF_MODE_MIN_LINES = int(os.getenv("DIFF_MODE_MIN_LINES", 200))
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+CODE_FENCE = re.compile(r'^```[\w-]*\n(.*?)\n?```$', re.DOTALL)
+
+diff_mode_outcomes = Counter("ai_debugger_diff_mode_total", "Diff-mode fixes by outcome.", ("outcome",))
+METRICS.append(diff_mode_outcomes)
+
+def use_diff_mode(code):
+    return DIFF_MODE_MIN_LINES > 0 and code.count("\n") + 1 >= DIFF_MODE_MIN_LINES
+
+def build_diff_prompt(code, language):
+    return f"""Fix the bugs in this {language} file:
 {code}
 Requirements:
-1. Correct syntax and logical errors.
-2. Add necessary includes (e.g., #include <iostream>).
-3. Ensure the code is runnable.
+1. Do NOT return the whole file. Return only a unified diff against the file above.
+2. Use @@ -start,count +start,count @@ hunk headers with 3 lines of unchanged context,
+   prefixing lines with ' ' (unchanged), '-' (removed) or '+' (added).
+3. Keep the original indentation exactly and make the smallest change that fixes the code.
 Format:
-<corrected_code>
+<unified_diff>
 ---EXPLANATION---
 <explanation>"""
-        elif language == "go":
-            prompt = f"""Fix this Go code:
-{code}
+
+def parse_unified_diff(diff_text):
+    diff_text = diff_text.strip()
+    fenced = CODE_FENCE.match(diff_text)
+    if fenced:
+        diff_text = fenced.group(1)
+    hunks = []
+    lines = diff_text.split("\n")
+    for index, line in enumerate(lines):
+        header = HUNK_HEADER.match(line)
+        if header:
+            hunks.append((int(header.group(1)), [], []))
+        elif not hunks or line.startswith(("+++ ", "\\")):
+            continue
+        elif line.startswith("--- ") and index + 1 < len(lines) and lines[index + 1].startswith("+++ "):
+            continue
+        elif line.startswith("-"):
+            hunks[-1][1].append(line[1:])
+        elif line.startswith("+"):
+            hunks[-1][2].append(line[1:])
+        else:
+            context = line[1:] if line.startswith(" ") else line
+            hunks[-1][1].append(context)
+            hunks[-1][2].append(context)
+    if not hunks:
+        raise ValueError("no hunks found")
+    return hunks
+
+def _find_hunk(lines, old, expected, start):
+    def matches(at, key):
+        return all(key(lines[at + i]) == key(line) for i, line in enumerate(old))
+    last = len(lines) - len(old)
+    candidates = sorted(range(start, last + 1), key=lambda at: abs(at - expected))
+    for key in (lambda line: line, str.rstrip):
+        for at in candidates:
+            if matches(at, key):
+                return at
+    return None
+
+def apply_unified_diff(code, diff_text):
+    lines = code.split("\n")
+    result = []
+    position = 0
+    for old_start, old, new in parse_unified_diff(diff_text):
+        at = _find_hunk(lines, old, max(old_start - 1, position), position)
+        if at is None:
+            raise ValueError(f"hunk at line {old_start} does not match the source")
+        result.extend(lines[position:at])
+        result.extend(new)
+        position = at + len(old)
+    result.extend(lines[position:])
+    return "\n".join(result)
+
+def fix_diff(code, fixed_code):
+    if not fixed_code or fixed_code.startswith("❌"):
+        return ""
+    return "\n".join(difflib.unified_diff(code.strip().split("\n"), fixed_code.strip().split("\n"),
+                                          "original", "fixed", lineterm=""))
+
+def fix_code_with_gemini(code, language):
+    cache_key = fix_cache_key(code, language)
+    cached = fix_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        return fix_flight.do(cache_key, lambda: request_fix(code, language, cache_key))
+    except Exception as e:
+        fixed_code_result = f"❌ Error contacting AI: {str(e)}"
+        explanation_text = "Could not generate explanation due to an error or repeated API failures."
+    return fixed_code_result, explanation_text
+
+def request_fix(code, language, cache_key):
+    fixed_code_result = None
+    chunks = None
+    if use_chunk_mode(code):
+        try:
+            chunks = split_into_chunks(code, language)
+        except Exception as e:
+            print(f"Splitting into chunks failed ({e}). Falling back to whole-file mode.")
+            chunk_mode_outcomes.inc(outcome="fallback")
+    if chunks:
+        fixed_code_result, explanation_text = request_chunked_fix(code, language, chunks)
+    if fixed_code_result is None and use_diff_mode(code):
+        fixed_code_result, explanation_text = request_diff_fix(code, language)
+    if fixed_code_result is None:
+        prompt = build_fix_prompt(code, language)
+        response = _gemini_api_call_with_retries(model_registry.get("fix").generate_content, prompt)
+        fixed_code_result, explanation_text = split_fix_response(response.text)
+    fixed_code_result = preprocess_code(fixed_code_result)
+    fix_cache.put(cache_key, fixed_code_result, explanation_text)
+    return fixed_code_result, explanation_text
+
+def request_diff_fix(code, language):
+    prompt = build_diff_prompt(code, language)
+    response = _gemini_api_call_with_retries(model_registry.get("fix").generate_content, prompt)
+    diff_text, explanation_text = split_fix_response(response.text)
+    try:
+        fixed_code_result = apply_unified_diff(code, diff_text)
+    except ValueError as e:
+        print(f"Diff from model did not apply ({e}). Falling back to full-file mode.")
+        diff_mode_outcomes.inc(outcome="fallback")
+        return None, None
+    diff_mode_outcomes.inc(outcome="applied")
+    return fixed_code_result, explanation_text
+
+CHUNK_MODE_MIN_LINES = int(os.getenv("CHUNK_MODE_MIN_LINES", 800))
+CHUNK_TARGET_LINES = int(os.getenv("CHUNK_TARGET_LINES", 200))
+CHUNK_CONTEXT_LINES = int(os.getenv("CHUNK_CONTEXT_LINES", 80))
+BRACE_LANGUAGES = {"java", "cpp", "go", "rust", "javascript", "typescript", "kotlin", "arduino"}
+QUOTED_STRING_LANGUAGES = {"javascript", "typescript"}
+BRACE_CONTEXT_LINE = re.compile(r'^\s*(import|package|use|using|#include|#define)\b')
+chunk_pool = ThreadPoolExecutor(max_workers=int(os.getenv("CHUNK_MAX_WORKERS", 8)), thread_name_prefix="fix-chunk")
+
+chunk_mode_outcomes = Counter("ai_debugger_chunk_mode_total", "Chunked fixes by outcome.", ("outcome",))
+METRICS.append(chunk_mode_outcomes)
+
+def use_chunk_mode(code):
+    return CHUNK_MODE_MIN_LINES > 0 and code.count("\n") + 1 >= CHUNK_MODE_MIN_LINES
+
+def uses_structured_fix(code):
+    return use_chunk_mode(code) or use_diff_mode(code)
+
+def python_cut_points(code):
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None, None
+    lines = code.split("\n")
+    context = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            context.extend(lines[node.lineno - 1:node.end_lineno])
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            context.append(lines[node.lineno - 1].rstrip())
+    return [node.end_lineno for node in tree.body], context
+
+def brace_cut_points(code, language=None):
+    # JS/TS single quotes delimit strings; elsewhere they are short char literals.
+    string_quotes = "\"`'" if language in QUOTED_STRING_LANGUAGES else "\"`"
+    lines = code.split("\n")
+    cuts = []
+    context = []
+    depth = 0
+    in_block_comment = False
+    for number, line in enumerate(lines, 1):
+        depth_before = depth
+        i = 0
+        while i < len(line):
+            ch = line[i]
+            if in_block_comment:
+                if line.startswith("*/", i):
+                    in_block_comment = False
+                    i += 1
+            elif line.startswith("//", i):
+                break
+            elif line.startswith("/*", i):
+                in_block_comment = True
+                i += 1
+            elif ch in string_quotes:
+                end = i + 1
+                while end < len(line) and line[end] != ch:
+                    end += 2 if line[end] == "\\" else 1
+                i = end
+            elif ch == "'":
+                close = line.find("'", i + 3 if line.startswith("\\", i + 1) else i + 1, i + 5)
+                if close != -1:
+                    i = close
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth = max(depth - 1, 0)
+            i += 1
+        stripped = line.strip()
+        if depth_before == 0 and (BRACE_CONTEXT_LINE.match(line) or "{" in stripped):
+            context.append(line.rstrip())
+        if depth == 0 and not in_block_comment and stripped.endswith(("}", ";")):
+            cuts.append(number)
+    return cuts, context
+
+def split_into_chunks(code, language):
+    if language == "python":
+        cuts, context = python_cut_points(code)
+    elif language in BRACE_LANGUAGES:
+        cuts, context = brace_cut_points(code, language)
+    else:
+        return None
+    if not cuts:
+        return None
+    lines = code.split("\n")
+    chunks = []
+    start = 0
+    for cut in cuts:
+        if cut - start >= CHUNK_TARGET_LINES:
+            chunks.append((start, cut))
+            start = cut
+    if start < len(lines):
+        if chunks and len(lines) - start < CHUNK_TARGET_LINES // 4:
+            chunks[-1] = (chunks[-1][0], len(lines))
+        else:
+            chunks.append((start, len(lines)))
+    if len(chunks) < 2:
+        return None
+    return {"context": "\n".join(context[:CHUNK_CONTEXT_LINES]),
+            "parts": [(start, end, "\n".join(lines[start:end])) for start, end in chunks]}
+
+def build_chunk_prompt(part, context, language):
+    return f"""This is one part of a larger {language} file. Other parts are being fixed separately.
+Imports and top-level signatures of the whole file, for reference only (do not return them):
+{context}
+
+Fix the bugs in this part:
+{part}
 Requirements:
-1. Correct syntax and logical errors.
-2. Add necessary imports and ensure proper package structure.
-3. Ensure the code is runnable.
+1. Return only this part, corrected, not the whole file.
+2. Keep the names and signatures of top-level declarations unchanged so the parts still fit together.
+3. Do not add code that belongs to other parts of the file.
 Format:
-<corrected_code>
+<corrected_part>
 ---EXPLANATION---
 <explanation>"""
-        elif language == "rust":
-            prompt = f"""Fix this Rust code:
-{code}
-Requirements:
-1. Correct syntax and ownership errors.
-2. Add necessary use statements and ensure proper function signatures.
-3. Ensure the code is runnable and passes the borrow checker.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language == "ruby":
-            prompt = f"""Fix this Ruby code:
-{code}
-Requirements:
-1. Correct syntax and logical errors.
-2. Ensure the code is runnable.
-3. Provide clear and concise comments where necessary.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language == "kotlin":
-            class_match = re.search(r'fun\s+main', code)
-            main_class = "MainKt" if class_match else "Main"
-            prompt = f"""Fix this Kotlin code:
-{code}
-Requirements:
-1. Correct syntax and logical errors.
-2. Add necessary imports.
-3. Ensure the code is runnable, typically with a main function.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language == "arduino":
-            prompt = f"""Fix this Arduino code:
-{code}
-Requirements:
-1. Ensure setup() and loop() functions are correctly defined and present.
-2. Fix any syntax errors, logical issues, and add necessary includes (e.g., #include <Arduino.h>).
-3. Provide clear and concise comments where necessary.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language in ["verilog", "systemverilog", "uvm"]:
-            prompt = f"""Fix this {language} code:
-{code}
-Requirements:
-1. Correct syntax errors and logical issues.
-2. Ensure proper module/interface/class definition and port/variable declarations.
-3. Provide clear and concise comments where necessary.
-4. If it's a testbench, ensure it instantiates the DUT correctly and includes initial/always blocks for simulation.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language in ["javascript", "typescript"]:
-            prompt = f"""Fix this {language} code. 
-{code}
-Requirements:
-1. Correct syntax or logical errors.
-2. Ensure the code is runnable and produces expected output.
-3. Provide clear and concise comments where necessary.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language in ["html", "css", "react", "django"]:
-            prompt = f"""Fix this {language} code.
-{code}
-Requirements:
-1. Correct syntax or logical errors.
-2. Ensure the code is well-structured and follows best practices.
-3. For React and Django, provide a runnable code snippet, but mention that a full project setup is required for real-world use.
-4. For HTML and CSS, provide a complete, well-formed code snippet.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        elif language == "sql":
-            prompt = f"""Analyze and fix this SQL code.
-{code}
-Requirements:
-1. Fix any syntax errors.
-2. Suggest improvements for performance or clarity.
-3. Provide the corrected, runnable query or schema.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        else: # Default to Python
-            prompt = f"""Fix this Python code:
-{code}
-Requirements:
-1. Correct syntax or logical errors.
-2. Do not convert string to int unless explicitly necessary for the logic.
-3. Preserve operations like string multiplication (e.g., 'a' * 3).
-4. Ensure the code is runnable and produces expected output if inputs are provided.
-Format:
-<corrected_code>
----EXPLANATION---
-<explanation>"""
-        response = _gemini_api_call_with_retries(chat.send_message, prompt)
-        full = response.text.strip()
-        if '---EXPLANATION---' in full:
-            fixed_code_result, explanation_text = map(str.strip, full.split('---EXPLANATION---', 1))
-        else:
-            fixed_code_result = full
-            explanation_text = "Explanation not provided by AI."
+
+def fix_chunk(part, context, language):
+    prompt = build_chunk_prompt(part, context, language)
+    response = _gemini_api_call_with_retries(model_registry.get("fix").generate_content, prompt)
+    fixed_part, explanation = split_fix_response(response.text)
+    fenced = CODE_FENCE.match(fixed_part)
+    return (fenced.group(1) if fenced else fixed_part), explanation
+
+def check_build(code, language):
+    # Compile or parse only: running the program here would need the caller's inputs and would run it twice.
+    entry = LANGUAGES.get(language)
+    if entry is None or entry.builder is None:
+        return None
+    if language == "java":
+        main_class = java_prompt_values(code)["main_class"]
+    else:
+        main_class = kotlin_main_class(code) if language == "kotlin" else "Main"
+    temp_dir = tempfile.mkdtemp()
+    try:
+        entry.builder(preprocess_code(code, clean=True), temp_dir, main_class)
+    except CompilationError as e:
+        return str(e) or "Compilation failed."
+    except FileNotFoundError:
+        return None
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return None
+
+def request_chunked_fix(code, language, chunks):
+    futures = [chunk_pool.submit(fix_chunk, part, chunks["context"], language) for _, _, part in chunks["parts"]]
+    try:
+        results = [future.result() for future in futures]
     except Exception as e:
-        fixed_code_result = f"❌ Error contacting AI: {str(e)}"
-        explanation_text = "Could not generate explanation due to an error or repeated API failures."
+        print(f"Chunked fix failed ({e}). Falling back to whole-file mode.")
+        chunk_mode_outcomes.inc(outcome="fallback")
+        return None, None
+    fixed_code_result = "\n".join(fixed_part for fixed_part, _ in results)
+    build_error = check_build(fixed_code_result, language)
+    if build_error is not None:
+        print(f"Reassembled chunks do not build ({build_error.strip()[:200]}). Falling back to whole-file mode.")
+        chunk_mode_outcomes.inc(outcome="fallback")
+        return None, None
+    chunk_mode_outcomes.inc(outcome="applied")
+    explanation_text = "\n\n".join(f"Lines {start + 1}-{end}: {explanation}"
+                                    for (start, end, _), (_, explanation) in zip(chunks["parts"], results))
+    return fixed_code_result, explanation_text
+
+_stage_local = threading.local()
+
+STAGE_TIMING_NAMES = {"compiling": "compile", "running": "run"}
+
+def report_stage(stage):
+    _finish_stage()
+    _stage_local.current = (stage, time.perf_counter())
+    callback = getattr(_stage_local, "callback", None)
+    if callback is not None:
+        callback(stage)
+
+def _finish_stage():
+    current = getattr(_stage_local, "current", None)
+    if current is not None:
+        stage, started = current
+        _stage_local.current = None
+        record_timing(STAGE_TIMING_NAMES.get(stage, stage), time.perf_counter() - started,
+                      getattr(_stage_local, "language", None) or "")
+
+EXEC_OUTPUT_LIMIT = int(os.getenv("EXEC_OUTPUT_LIMIT", 64 * 1024))
+EXEC_MEMORY_LIMIT_MB = int(os.getenv("EXEC_MEMORY_LIMIT_MB", 512))
+EXEC_CPU_LIMIT = int(os.getenv("EXEC_CPU_LIMIT", 60))
+EXEC_MAX_OPEN_FILES = int(os.getenv("EXEC_MAX_OPEN_FILES", 256))
+
+def truncation_marker(limit=EXEC_OUTPUT_LIMIT):
+    return f"\n... [output truncated at {limit} bytes]"
+
+def _limit_resources(memory_limit_mb):
+    # Runs in the forked child before exec, so it must not import anything or take locks.
+    def apply():
+        resource.setrlimit(resource.RLIMIT_CPU, (EXEC_CPU_LIMIT, EXEC_CPU_LIMIT + 1))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (EXEC_MAX_OPEN_FILES, EXEC_MAX_OPEN_FILES))
+        if memory_limit_mb:
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return apply
+
+MEASURE_POLL_INTERVAL = float(os.getenv("MEASURE_POLL_INTERVAL", 0.005))
+
+def _peak_rss_kb(pid):
+    # ru_maxrss from wait4 still carries the forking server's high-water mark after exec, so read the child's own mm.
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _wait_measured(process, deadline):
+    # os.wait4 reports the rusage of this one child, which getrusage(RUSAGE_CHILDREN) cannot do across threads.
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return usage
+        if time.monotonic() >= deadline:
+            raise subprocess.TimeoutExpired(process.args, 0)
+        time.sleep(0.002)
+
+def run_limited(command, timeout, cwd=None, input_text=None, memory_limit_mb=None, output_limit=EXEC_OUTPUT_LIMIT, env=None,
+                measure=False):
+    started = time.perf_counter()
+    usage = None
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        preexec_fn=_limit_resources(memory_limit_mb) if os.name == "posix" else None,
+        start_new_session=True,
+    )
+    stdout_fd, stderr_fd = process.stdout.fileno(), process.stderr.fileno()
+    buffers = {stdout_fd: bytearray(), stderr_fd: bytearray()}
+    pending = memoryview(input_text.encode("utf-8")) if input_text is not None else None
+    truncated = False
+    peak_rss = None
+    deadline = time.monotonic() + timeout
+    try:
+        with selectors.DefaultSelector() as selector:
+            for stream in (process.stdout, process.stderr):
+                selector.register(stream, selectors.EVENT_READ)
+            if pending:
+                # Feed stdin from the same loop so a program that never reads it still hits the deadline.
+                os.set_blocking(process.stdin.fileno(), False)
+                selector.register(process.stdin, selectors.EVENT_WRITE)
+            elif pending is not None:
+                process.stdin.close()
+            while selector.get_map() and not truncated:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    _kill_process_group(process)
+                    raise subprocess.TimeoutExpired(command, timeout)
+                if measure:
+                    peak_rss = max(filter(None, (peak_rss, _peak_rss_kb(process.pid))), default=None)
+                    remaining = min(remaining, MEASURE_POLL_INTERVAL)
+                for key, _ in selector.select(remaining):
+                    if key.fileobj is process.stdin:
+                        try:
+                            pending = pending[os.write(key.fd, pending[:65536]):]
+                        except BlockingIOError:
+                            continue
+                        except BrokenPipeError:
+                            pending = pending[:0]
+                        if not pending:
+                            selector.unregister(process.stdin)
+                            process.stdin.close()
+                        continue
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    buffer = buffers[key.fd]
+                    buffer += chunk[:max(output_limit - len(buffer), 0)]
+                    truncated = truncated or len(buffer) >= output_limit
+        if truncated:
+            _kill_process_group(process)
+        try:
+            if measure and process.returncode is None:
+                usage = _wait_measured(process, max(deadline, time.monotonic() + 0.1))
+            returncode = process.wait(max(deadline - time.monotonic(), 0.1))
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process)
+            raise subprocess.TimeoutExpired(command, timeout)
+    finally:
+        if process.stdin is not None and not process.stdin.closed:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+        process.stdout.close()
+        process.stderr.close()
+    stdout = buffers[stdout_fd].decode("utf-8", "replace")
+    stderr = buffers[stderr_fd].decode("utf-8", "replace")
+    if len(buffers[stdout_fd]) >= output_limit:
+        # The program was stopped at the cap; show what it printed rather than the kill signal.
+        stdout += truncation_marker(output_limit)
+        returncode = 0
+    elif len(buffers[stderr_fd]) >= output_limit:
+        stderr += truncation_marker(output_limit)
+    completed = subprocess.CompletedProcess(command, returncode, stdout, stderr)
+    if measure:
+        completed.wall_time = time.perf_counter() - started
+        completed.rusage = usage
+        completed.peak_rss_kb = peak_rss
+    return completed
+
+def _kill_process_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+    process.wait()
+
+PYTHON_POOL_SIZE = int(os.getenv("PYTHON_POOL_SIZE", 4))
+PYTHON_TIMEOUT = int(os.getenv("PYTHON_TIMEOUT", 10))
+PYTHON_CPU_LIMIT = int(os.getenv("PYTHON_CPU_LIMIT", 10))
+PYTHON_MEMORY_LIMIT_MB = int(os.getenv("PYTHON_MEMORY_LIMIT_MB", 512))
+PYTHON_PRELOAD_MODULES = ["collections", "itertools", "functools", "math", "random", "re", "json",
+                          "string", "datetime", "decimal", "fractions", "heapq", "bisect", "statistics"]
+
+class OutputLimitExceeded(BaseException):
+    pass
+
+class _CappedOutput(io.StringIO):
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+
+    def write(self, text):
+        remaining = self.limit - self.size
+        if len(text) > remaining:
+            super().write(text[:max(remaining, 0)])
+            self.size = self.limit
+            raise OutputLimitExceeded()
+        self.size += len(text)
+        return super().write(text)
+
+def _read_stdin_line(prompt=""):
+    # Test inputs arrive on stdin. Prompts are not echoed, so the output holds only what the program prints.
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError("EOF when reading a line")
+    return line[:-1] if line.endswith("\n") else line
+
+def _python_worker_main(conn):
+    job = conn.recv()
+    if job is None:
+        return
+    code, stdin_text, cpu_seconds, memory_bytes, output_limit = job
+    try:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (EXEC_MAX_OPEN_FILES, EXEC_MAX_OPEN_FILES))
+    except (AttributeError, ValueError, OSError):
+        pass
+    sys.stdin = io.StringIO(stdin_text)
+    sys.stdout = captured = _CappedOutput(output_limit)
+    try:
+        exec(code, {"__name__": "__main__", "input": _read_stdin_line})
+        reply = ("ok", captured.getvalue(), "")
+    except OutputLimitExceeded:
+        reply = ("ok", captured.getvalue() + truncation_marker(output_limit), "")
+    except MemoryError:
+        reply = ("memory", captured.getvalue(), "")
+    except SystemExit as e:
+        reply = ("ok", captured.getvalue(), "") if e.code in (None, 0) else ("error", captured.getvalue(), f"exit status {e.code}")
+    except BaseException as e:
+        reply = ("error", captured.getvalue(), str(e))
+    conn.send(reply)
+
+class PythonWorkerPool:
+    def __init__(self, size):
+        self.size = size
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._context = None
+
+    def start(self):
+        with self._lock:
+            if self._context is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                context = multiprocessing.get_context(method)
+                if method == "forkserver":
+                    # Children fork from a server that already imported this module and the common stdlib.
+                    context.set_forkserver_preload(list(dict.fromkeys(["__main__", __name__, *PYTHON_PRELOAD_MODULES])))
+                self._context = context
+                for _ in range(self.size):
+                    self._ready.put(self._spawn())
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_python_worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _replenish(self):
+        if self._ready.qsize() < self.size:
+            self._ready.put(self._spawn())
+
+    def _checkout(self):
+        self.start()
+        worker = None
+        while worker is None:
+            try:
+                worker = self._ready.get_nowait()
+            except queue.Empty:
+                worker = self._spawn()
+            if not worker[0].is_alive():
+                worker[1].close()
+                worker = None
+        threading.Thread(target=self._replenish, daemon=True).start()
+        return worker
+
+    def run(self, code, stdin_text="", timeout=PYTHON_TIMEOUT):
+        process, conn = self._checkout()
+        try:
+            conn.send((code, stdin_text, PYTHON_CPU_LIMIT, PYTHON_MEMORY_LIMIT_MB * 1024 * 1024, EXEC_OUTPUT_LIMIT))
+            if not conn.poll(timeout):
+                return "timeout", "", ""
+            try:
+                return conn.recv()
+            except (EOFError, OSError):
+                process.join(1)
+                if process.exitcode in (-signal.SIGXCPU, -signal.SIGKILL):
+                    return "timeout", "", ""
+                return "error", "", f"Python worker exited with code {process.exitcode}"
+        finally:
+            conn.close()
+            if process.is_alive():
+                process.kill()
+            process.join(1)
+
+python_pool = PythonWorkerPool(PYTHON_POOL_SIZE)
 
 def execute_python_code(code, test_inputs):
-    inputs = re.findall(r'input\s*\(.*?\)', code)
-    if test_inputs and len(test_inputs) < len(inputs):
-        return f"❌ Not enough test inputs (expected {len(inputs)})"
-    for i, call in enumerate(inputs):
-        if i < len(test_inputs):
-            code = code.replace(call, repr(test_inputs[i]), 1)
+    test_inputs = list(test_inputs or [])
+    expected = len(find_input_calls(code))
+    if test_inputs and len(test_inputs) < expected:
+        return f"❌ Not enough test inputs (expected {expected})"
+    test_inputs += [""] * (expected - len(test_inputs))
+    report_stage("running")
+    status, stdout, error = python_pool.run(code, "".join(value + "\n" for value in test_inputs))
+    if status == "timeout":
+        return "❌ Execution timed out."
+    if status == "memory":
+        return "❌ Execution exceeded the memory limit."
+    if status == "error":
+        return f"❌ Execution failed: {error}"
+    return stdout.strip() or "✅ Ran successfully."
+
+class PythonProgram:
+    def __init__(self, code, temp_dir):
+        self.code = code
+        self.temp_dir = temp_dir
+
+    def run(self, stdin_text=None, timeout=PYTHON_TIMEOUT):
+        status, stdout, error = python_pool.run(self.code, stdin_text or "", timeout)
+        if status == "timeout":
+            raise subprocess.TimeoutExpired(["python"], timeout)
+        if status == "memory":
+            return subprocess.CompletedProcess(["python"], 1, stdout, "Execution exceeded the memory limit.")
+        return subprocess.CompletedProcess(["python"], 1 if status == "error" else 0, stdout, error)
+
+    def script(self, *flags):
+        source_path = os.path.join(self.temp_dir, "main.py")
+        if not os.path.exists(source_path):
+            with open(source_path, "w") as f:
+                f.write(self.code)
+        return BuiltProgram([sys.executable, *flags, source_path], self.temp_dir, PYTHON_MEMORY_LIMIT_MB)
+
+    def spawn(self):
+        # Pool workers buffer output until the job ends, so live runs get their own unbuffered interpreter.
+        return self.script("-u").spawn()
+
+    def measure(self, stdin_text=None, timeout=PYTHON_TIMEOUT):
+        # Pool workers report no resource usage, so measured runs use a fresh interpreter like compiled programs do.
+        return self.script().measure(stdin_text, timeout)
+
+def build_python(code, temp_dir, main_class=None):
+    try:
+        compile(code, "<main>", "exec")
+    except SyntaxError as e:
+        raise CompilationError(f"{e.msg} (line {e.lineno})")
+    # Start the pool here so a cold start counts as build time rather than against each case's timeout.
+    python_pool.start()
+    return PythonProgram(code, temp_dir)
+
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 10))
+PROFILE_TIMEOUT = int(os.getenv("PROFILE_TIMEOUT", 30))
+PERF_EVENTS = os.getenv("PERF_EVENTS", "task-clock,cycles,instructions,cache-misses,branch-misses")
+GPROF_CALL_UNIT = re.compile(r'\b([KMGmun]?)s/call\b')
+GPROF_UNIT_MS = {"G": 1e12, "M": 1e9, "K": 1e6, "": 1000, "m": 1, "u": 1e-3, "n": 1e-6}
+GPROF_FLAT_LINE = re.compile(r'^\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s+(?:(\d+)\s+([\d.]+)\s+([\d.]+)\s+)?(.+)$')
+PYTHON_PROFILE_HARNESS = """
+import cProfile, json, os, pstats, sys, time, traceback, tracemalloc
+source_path, report_path, top_n = sys.argv[1], sys.argv[2], int(sys.argv[3])
+sys.argv = [source_path]
+with open(source_path) as f:
+    program = compile(f.read(), source_path, "exec")
+profiler = cProfile.Profile()
+status = 0
+tracemalloc.start()
+wall_started, cpu_started = time.perf_counter(), time.process_time()
+try:
+    profiler.runctx(program, {"__name__": "__main__"}, None)
+except SystemExit as e:
+    status = e.code if isinstance(e.code, int) else int(e.code is not None)
+except BaseException:
+    traceback.print_exc()
+    status = 1
+wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+heap_peak = tracemalloc.get_traced_memory()[1]
+tracemalloc.stop()
+sys.stdout.flush()
+hotspots = []
+for (filename, line, name), (_, calls, self_time, total_time, _) in pstats.Stats(profiler).stats.items():
+    if "_lsprof.Profiler" in name:
+        continue
+    if filename == "~":
+        label = name
+    elif filename == source_path:
+        label = f"{name} (line {line})"
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    hotspots.append({"name": label, "calls": calls, "self_ms": round(self_time * 1000, 3),
+                     "total_ms": round(total_time * 1000, 3)})
+hotspots.sort(key=lambda hotspot: hotspot["self_ms"], reverse=True)
+with open(report_path, "w") as f:
+    json.dump({"wall_ms": round(wall * 1000, 3), "cpu_ms": round(cpu * 1000, 3), "python_heap_peak_kb": heap_peak // 1024,
+               "hotspots": hotspots[:top_n]}, f)
+sys.exit(status)
+"""
+
+def profile_report(tool, run, hotspots=None, counters=None):
+    report = {"tool": tool, "returncode": run.returncode, "output": run.stdout, "stderr": run.stderr,
+              "wall_ms": round(run.wall_time * 1000, 3), "cpu_ms": None, "peak_memory_kb": None,
+              "hotspots": hotspots or [], "counters": counters or {}}
+    if run.rusage is not None:
+        report["cpu_ms"] = round((run.rusage.ru_utime + run.rusage.ru_stime) * 1000, 3)
+    report["peak_memory_kb"] = run.peak_rss_kb
+    return report
+
+def with_perf_stat(command, temp_dir):
+    if not TOOLCHAINS["perf"].available:
+        return command, None
+    counters_path = os.path.join(temp_dir, "perf-stat.csv")
+    return ['perf', 'stat', '-x,', '-o', counters_path, '-e', PERF_EVENTS, '--', *command], counters_path
+
+def read_perf_counters(counters_path):
+    counters = {}
+    if counters_path is None or not os.path.exists(counters_path):
+        return counters
+    with open(counters_path) as f:
+        for line in f:
+            fields = line.strip().split(",")
+            if len(fields) < 3 or line.startswith("#"):
+                continue
+            try:
+                counters[fields[2]] = float(fields[0])
+            except ValueError:
+                continue
+    return counters
+
+def parse_gprof_flat(text, top_n=PROFILE_TOP_N):
+    hotspots = []
+    in_table = False
+    call_unit_ms = 1
+    for line in text.splitlines():
+        if line.strip().startswith("time") and "name" in line:
+            # gprof picks s/call, ms/call or us/call for the per-call columns depending on their magnitude.
+            unit = GPROF_CALL_UNIT.search(line)
+            call_unit_ms = GPROF_UNIT_MS[unit.group(1)] if unit else 1
+            in_table = True
+            continue
+        match = GPROF_FLAT_LINE.match(line) if in_table else None
+        if match is None:
+            continue
+        _, _, self_seconds, calls, _, total_ms_per_call, name = match.groups()
+        calls = int(calls) if calls else None
+        total_ms = float(total_ms_per_call) * call_unit_ms * calls if calls else None
+        hotspots.append({"name": name.strip(), "calls": calls, "self_ms": round(float(self_seconds) * 1000, 3),
+                         "total_ms": round(total_ms, 3) if total_ms is not None else None})
+    return hotspots[:top_n]
+
+def parse_cpu_profile(profile, top_n=PROFILE_TOP_N):
+    samples = profile.get("samples") or []
+    if not samples:
+        return []
+    sample_ms = (profile["endTime"] - profile["startTime"]) / 1000 / len(samples)
+    totals = {}
+    for node in profile.get("nodes", []):
+        frame = node["callFrame"]
+        name = frame.get("functionName") or "(anonymous)"
+        if name in ("(idle)", "(program)", "(root)"):
+            continue
+        url = os.path.basename(frame.get("url") or "")
+        label = f"{name} ({url}:{frame.get('lineNumber', -1) + 1})" if url else name
+        totals[label] = totals.get(label, 0) + node.get("hitCount", 0)
+    hotspots = [{"name": label, "calls": None, "self_ms": round(hits * sample_ms, 3), "total_ms": None}
+                for label, hits in totals.items() if hits]
+    hotspots.sort(key=lambda hotspot: hotspot["self_ms"], reverse=True)
+    return hotspots[:top_n]
+
+def profile_python(code, temp_dir, main_class, stdin_text):
+    try:
+        compile(code, "<main>", "exec")
+    except SyntaxError as e:
+        raise CompilationError(f"{e.msg} (line {e.lineno})")
+    source_path = os.path.join(temp_dir, "main.py")
+    report_path = os.path.join(temp_dir, "profile.json")
+    with open(source_path, "w") as f:
+        f.write(code)
+    report_stage("running")
+    run = run_limited([sys.executable, "-c", PYTHON_PROFILE_HARNESS, source_path, report_path, str(PROFILE_TOP_N)],
+                      timeout=PROFILE_TIMEOUT, cwd=temp_dir, input_text=stdin_text,
+                      memory_limit_mb=PYTHON_MEMORY_LIMIT_MB, measure=True)
+    report = profile_report("cProfile + tracemalloc", run)
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            measured = json.load(f)
+        # The harness times only the user's code, leaving out interpreter start-up.
+        report.update(measured)
+    return report
+
+def profile_cpp(code, temp_dir, main_class, stdin_text):
+    gprof = TOOLCHAINS["gprof"].available
+    program = build_cpp(code, temp_dir, flags=[*CPP_FLAGS, '-pg'] if gprof else None)
+    command, counters_path = with_perf_stat(program.command, temp_dir)
+    report_stage("running")
+    run = run_limited(command, timeout=PROFILE_TIMEOUT, cwd=temp_dir, input_text=stdin_text,
+                      memory_limit_mb=program.memory_limit_mb, measure=True)
+    hotspots = []
+    gmon_path = os.path.join(temp_dir, "gmon.out")
+    if gprof and os.path.exists(gmon_path):
+        flat = run_limited(['gprof', '-b', '-p', program.command[0], gmon_path], timeout=15, cwd=temp_dir)
+        hotspots = parse_gprof_flat(flat.stdout)
+    return profile_report("gprof" if gprof else "rusage", run, hotspots, read_perf_counters(counters_path))
+
+def profile_node(builder):
+    def profile(code, temp_dir, main_class, stdin_text):
+        program = builder(code, temp_dir, main_class)
+        profile_dir = os.path.join(temp_dir, "cpu-profile")
+        command = [program.command[0], '--cpu-prof', '--cpu-prof-dir', profile_dir, *program.command[1:]]
+        report_stage("running")
+        run = run_limited(command, timeout=PROFILE_TIMEOUT, cwd=temp_dir, input_text=stdin_text,
+                          memory_limit_mb=program.memory_limit_mb, env=program.env, measure=True)
+        hotspots = []
+        profiles = sorted(os.listdir(profile_dir)) if os.path.isdir(profile_dir) else []
+        if profiles:
+            with open(os.path.join(profile_dir, profiles[-1])) as f:
+                hotspots = parse_cpu_profile(json.load(f))
+        return profile_report("node --cpu-prof", run, hotspots)
+    return profile
+
+def profile_built(builder, use_perf=False):
+    def profile(code, temp_dir, main_class, stdin_text):
+        program = builder(code, temp_dir, main_class)
+        command, counters_path = with_perf_stat(program.command, temp_dir) if use_perf else (program.command, None)
+        report_stage("running")
+        run = run_limited(command, timeout=PROFILE_TIMEOUT, cwd=program.cwd, input_text=stdin_text,
+                          memory_limit_mb=program.memory_limit_mb, env=program.env, measure=True)
+        return profile_report("perf stat" if counters_path else "rusage", run, counters=read_perf_counters(counters_path))
+    return profile
+
+JVM_POOL_ENABLED = os.getenv("JVM_POOL_ENABLED", "1") == "1"
+JVM_POOL_SIZE = int(os.getenv("JVM_POOL_SIZE", 2))
+JVM_WORKER_MAX_JOBS = int(os.getenv("JVM_WORKER_MAX_JOBS", 100))
+JVM_WORKER_MAX_HEAP_MB = int(os.getenv("JVM_WORKER_MAX_HEAP_MB", 256))
+JVM_WORKER_XMX = os.getenv("JVM_WORKER_XMX", "512m")
+JVM_WORKER_STARTUP_TIMEOUT = int(os.getenv("JVM_WORKER_STARTUP_TIMEOUT", 60))
+JVM_CLASS_NAME = re.compile(r'[A-Za-z_$][\w$]*')
+KOTLIN_COMPILER_JARS = ["kotlin-compiler.jar", "kotlin-stdlib.jar", "kotlin-reflect.jar", "kotlin-script-runtime.jar",
+                        "trove4j.jar", "kotlinx-coroutines-core-jvm.jar", "annotations-13.0.jar"]
+
+# Long-lived JVM worker. Protocol, one line per message:
+#   -> RUN <JAVA|KOTLIN> <main class> <run timeout ms> <base64 source>
+#   <- STAGE running
+#   <- RESULT <OK|COMPILE_ERROR|RUNTIME_ERROR|TIMEOUT|TRUNCATED|ERROR> <base64 stdout> <base64 stderr> <used heap bytes>
+JVM_WORKER_SOURCE = r"""
+import java.io.*;
+import java.lang.reflect.*;
+import java.net.*;
+import java.nio.file.*;
+import java.util.*;
+import java.util.stream.*;
+import javax.tools.*;
+
+public class JvmWorker {
+    private static PrintStream protocolOut;
+    private static volatile CappedOutputStream jobOut;
+    private static volatile CappedOutputStream jobErr;
+
+    static class OutputLimitExceeded extends Error {
+    }
+
+    static class CappedOutputStream extends ByteArrayOutputStream {
+        private final int limit;
+        boolean truncated;
+
+        CappedOutputStream(int limit) {
+            this.limit = limit;
+        }
+
+        @Override
+        public synchronized void write(int b) {
+            write(new byte[] {(byte) b}, 0, 1);
+        }
+
+        @Override
+        public synchronized void write(byte[] b, int off, int len) {
+            int room = limit - count;
+            if (len > room) {
+                super.write(b, off, Math.max(room, 0));
+                truncated = true;
+                throw new OutputLimitExceeded();
+            }
+            super.write(b, off, len);
+        }
+    }
+
+    static class Compiled {
+        ClassLoader loader;
+        List<String> classNames = new ArrayList<>();
+    }
+
+    public static void main(String[] args) throws Exception {
+        protocolOut = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        BufferedReader in = new BufferedReader(new InputStreamReader(new FileInputStream(FileDescriptor.in), "UTF-8"));
+        System.setIn(new ByteArrayInputStream(new byte[0]));
+        // System.exit in user code still ends the worker; report what the program printed before it went.
+        Runtime.getRuntime().addShutdownHook(new Thread(() -> {
+            CappedOutputStream out = jobOut;
+            CappedOutputStream err = jobErr;
+            if (out != null && err != null) {
+                try {
+                    respond("EXITED", out.toString("UTF-8"), err.toString("UTF-8"));
+                } catch (Throwable ignored) {
+                }
+            }
+        }));
+        boolean java = warmUp("JAVA", "public class Warmup { public static void main(String[] args) {} }", "Warmup");
+        boolean kotlin = System.getProperty("kotlin.home") != null && warmUp("KOTLIN", "fun main() {}", "MainKt");
+        protocolOut.println("READY " + java + " " + kotlin);
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] parts = line.split(" ");
+            try {
+                String source = new String(Base64.getDecoder().decode(parts[4]), "UTF-8");
+                handle(parts[1], parts[2], Long.parseLong(parts[3]), source);
+            } catch (Throwable t) {
+                respond("ERROR", "", t.toString());
+            }
+        }
+    }
+
+    private static boolean warmUp(String kind, String source, String mainClass) {
+        Path workDir = null;
+        try {
+            workDir = Files.createTempDirectory("jvmworker");
+            return compile(kind, mainClass, source, workDir, new ByteArrayOutputStream()) != null;
+        } catch (Throwable t) {
+            return false;
+        } finally {
+            deleteRecursively(workDir);
+        }
+    }
+
+    private static void handle(String kind, String mainClass, long timeoutMillis, String source) throws Exception {
+        Path workDir = Files.createTempDirectory("jvmworker");
+        try {
+            ByteArrayOutputStream diagnostics = new ByteArrayOutputStream();
+            Compiled compiled = compile(kind, mainClass, source, workDir, diagnostics);
+            if (compiled == null) {
+                respond("COMPILE_ERROR", "", diagnostics.toString("UTF-8"));
+                return;
+            }
+            protocolOut.println("STAGE running");
+            run(compiled, mainClass, timeoutMillis);
+        } finally {
+            deleteRecursively(workDir);
+        }
+    }
+
+    private static Compiled compile(String kind, String mainClass, String source, Path workDir,
+                                    ByteArrayOutputStream diagnostics) throws Exception {
+        return kind.equals("KOTLIN") ? compileKotlin(source, workDir, diagnostics) : compileJava(mainClass, source, diagnostics);
+    }
+
+    private static Compiled compileJava(String mainClass, final String source, ByteArrayOutputStream diagnostics) throws Exception {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        final Map<String, ByteArrayOutputStream> classes = new HashMap<>();
+        StandardJavaFileManager standard = compiler.getStandardFileManager(null, null, null);
+        JavaFileManager manager = new ForwardingJavaFileManager<JavaFileManager>(standard) {
+            @Override
+            public JavaFileObject getJavaFileForOutput(Location location, final String className,
+                                                       JavaFileObject.Kind kind, FileObject sibling) {
+                return new SimpleJavaFileObject(URI.create("mem:///" + className.replace('.', '/') + kind.extension), kind) {
+                    @Override
+                    public OutputStream openOutputStream() {
+                        ByteArrayOutputStream bytes = new ByteArrayOutputStream();
+                        classes.put(className, bytes);
+                        return bytes;
+                    }
+                };
+            }
+        };
+        JavaFileObject file = new SimpleJavaFileObject(URI.create("string:///" + mainClass + ".java"), JavaFileObject.Kind.SOURCE) {
+            @Override
+            public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+                return source;
+            }
+        };
+        Writer errors = new OutputStreamWriter(diagnostics, "UTF-8");
+        boolean ok = compiler.getTask(errors, manager, null, null, null, Collections.singletonList(file)).call();
+        errors.flush();
+        if (!ok) {
+            return null;
+        }
+        Compiled compiled = new Compiled();
+        compiled.classNames.addAll(classes.keySet());
+        compiled.loader = new ClassLoader(JvmWorker.class.getClassLoader()) {
+            @Override
+            protected Class<?> findClass(String name) throws ClassNotFoundException {
+                ByteArrayOutputStream bytes = classes.get(name);
+                if (bytes == null) {
+                    throw new ClassNotFoundException(name);
+                }
+                byte[] data = bytes.toByteArray();
+                return defineClass(name, data, 0, data.length);
+            }
+        };
+        return compiled;
+    }
+
+    private static Compiled compileKotlin(String source, Path workDir, ByteArrayOutputStream diagnostics) throws Exception {
+        Path sourceFile = workDir.resolve("main.kt");
+        Path classesDir = workDir.resolve("classes");
+        Files.write(sourceFile, source.getBytes("UTF-8"));
+        Files.createDirectories(classesDir);
+        Class<?> compilerClass = Class.forName("org.jetbrains.kotlin.cli.jvm.K2JVMCompiler");
+        Object compiler = compilerClass.getDeclaredConstructor().newInstance();
+        Method exec = compilerClass.getMethod("exec", PrintStream.class, String[].class);
+        PrintStream errors = new PrintStream(diagnostics, true, "UTF-8");
+        Object exitCode = exec.invoke(compiler, errors, new String[] {
+            sourceFile.toString(), "-d", classesDir.toString(), "-kotlin-home", System.getProperty("kotlin.home")
+        });
+        if (!exitCode.toString().equals("OK")) {
+            return null;
+        }
+        Compiled compiled = new Compiled();
+        try (Stream<Path> files = Files.walk(classesDir)) {
+            files.filter(p -> p.toString().endsWith(".class")).forEach(p -> {
+                String relative = classesDir.relativize(p).toString();
+                compiled.classNames.add(relative.substring(0, relative.length() - 6).replace(File.separatorChar, '.'));
+            });
+        }
+        compiled.loader = new URLClassLoader(new URL[] {classesDir.toUri().toURL()}, JvmWorker.class.getClassLoader());
+        for (String name : compiled.classNames) {
+            compiled.loader.loadClass(name);
+        }
+        return compiled;
+    }
+
+    private static Method findMain(Compiled compiled, String mainClass) {
+        List<String> candidates = new ArrayList<>();
+        candidates.add(mainClass);
+        candidates.add("MainKt");
+        candidates.addAll(compiled.classNames);
+        for (String name : candidates) {
+            try {
+                Method main = compiled.loader.loadClass(name).getMethod("main", String[].class);
+                if (Modifier.isStatic(main.getModifiers())) {
+                    return main;
+                }
+            } catch (Throwable ignored) {
+            }
+        }
+        return null;
+    }
+
+    private static void run(Compiled compiled, String mainClass, long timeoutMillis) throws Exception {
+        final Method main = findMain(compiled, mainClass);
+        if (main == null) {
+            respond("RUNTIME_ERROR", "", "No static main method found in " + mainClass);
+            return;
+        }
+        int outputLimit = Integer.getInteger("worker.outputLimit", 65536);
+        CappedOutputStream out = new CappedOutputStream(outputLimit);
+        CappedOutputStream err = new CappedOutputStream(outputLimit);
+        final Throwable[] failure = new Throwable[1];
+        PrintStream oldOut = System.out;
+        PrintStream oldErr = System.err;
+        System.setOut(new PrintStream(out, true, "UTF-8"));
+        System.setErr(new PrintStream(err, true, "UTF-8"));
+        jobOut = out;
+        jobErr = err;
+        Thread thread = new Thread(() -> {
+            try {
+                main.invoke(null, (Object) new String[0]);
+            } catch (InvocationTargetException e) {
+                failure[0] = e.getCause();
+            } catch (Throwable t) {
+                failure[0] = t;
+            }
+        });
+        thread.setContextClassLoader(compiled.loader);
+        thread.setDaemon(true);
+        thread.start();
+        thread.join(timeoutMillis);
+        System.out.flush();
+        System.err.flush();
+        System.setOut(oldOut);
+        System.setErr(oldErr);
+        jobOut = null;
+        jobErr = null;
+        if (thread.isAlive()) {
+            // A runaway thread cannot be stopped safely; report and let the pool replace this worker.
+            respond("TIMEOUT", out.toString("UTF-8"), err.toString("UTF-8"));
+            Runtime.getRuntime().halt(0);
+        }
+        if (out.truncated || err.truncated) {
+            respond("TRUNCATED", out.toString("UTF-8"), err.toString("UTF-8"));
+        } else if (failure[0] != null) {
+            StringWriter trace = new StringWriter();
+            failure[0].printStackTrace(new PrintWriter(trace));
+            respond("RUNTIME_ERROR", out.toString("UTF-8"), err.toString("UTF-8") + trace);
+        } else {
+            respond("OK", out.toString("UTF-8"), err.toString("UTF-8"));
+        }
+    }
+
+    private static void respond(String status, String out, String err) throws UnsupportedEncodingException {
+        Runtime runtime = Runtime.getRuntime();
+        Base64.Encoder encoder = Base64.getEncoder();
+        protocolOut.println("RESULT " + status + " " + encoder.encodeToString(out.getBytes("UTF-8")) + " "
+            + encoder.encodeToString(err.getBytes("UTF-8")) + " " + (runtime.totalMemory() - runtime.freeMemory()));
+    }
+
+    private static void deleteRecursively(Path path) {
+        if (path == null) {
+            return;
+        }
+        try (Stream<Path> files = Files.walk(path)) {
+            files.sorted(Comparator.reverseOrder()).forEach(p -> p.toFile().delete());
+        } catch (IOException ignored) {
+        }
+    }
+}
+"""
+
+def find_kotlin_home():
+    kotlinc = shutil.which("kotlinc")
+    if not kotlinc:
+        return None
+    home = os.path.dirname(os.path.dirname(os.path.realpath(kotlinc)))
+    return home if os.path.exists(os.path.join(home, "lib", "kotlin-compiler.jar")) else None
+
+class JvmWorker:
+    def __init__(self, classpath, kotlin_home):
+        command = ["java", f"-Xmx{JVM_WORKER_XMX}", f"-Dworker.outputLimit={EXEC_OUTPUT_LIMIT}", "-cp", classpath]
+        if kotlin_home:
+            command.append(f"-Dkotlin.home={kotlin_home}")
+        command.append("JvmWorker")
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, encoding="utf-8", bufsize=1)
+        self.jobs = 0
+        self.heap_bytes = 0
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines, daemon=True).start()
+        ready = self._next_line(JVM_WORKER_STARTUP_TIMEOUT)
+        if ready is None or not ready.startswith("READY "):
+            self.close()
+            raise RuntimeError("JVM worker did not start.")
+        _, java_ready, kotlin_ready = ready.split(" ")
+        self.supports = {"JAVA": java_ready == "true", "KOTLIN": kotlin_ready == "true"}
+
+    def _read_lines(self):
+        for line in self.process.stdout:
+            self._lines.put(line.rstrip("\n"))
+        self._lines.put(None)
+
+    def _next_line(self, timeout):
+        try:
+            return self._lines.get(timeout=max(timeout, 0))
+        except queue.Empty:
+            return None
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, kind, main_class, source, compile_timeout, run_timeout):
+        self.jobs += 1
+        payload = base64.b64encode(source.encode("utf-8")).decode("ascii")
+        try:
+            self.process.stdin.write(f"RUN {kind} {main_class} {run_timeout * 1000} {payload}\n")
+            self.process.stdin.flush()
+        except OSError:
+            return None
+        report_stage("compiling")
+        deadline = time.monotonic() + compile_timeout + run_timeout
+        while True:
+            line = self._next_line(deadline - time.monotonic())
+            if line is None:
+                if self.alive():
+                    self.close()
+                    return "TIMEOUT", "", ""
+                # The job was delivered, so the program ended the worker itself; running it again cold would repeat it.
+                return "EXITED", "", ""
+            if line.startswith("STAGE "):
+                report_stage(line[len("STAGE "):])
+            elif line.startswith("RESULT "):
+                _, status, out, err, heap = line.split(" ")
+                self.heap_bytes = int(heap)
+                return (status, base64.b64decode(out).decode("utf-8", "replace"),
+                        base64.b64decode(err).decode("utf-8", "replace"))
+
+    def close(self):
+        try:
+            self.process.kill()
+            self.process.wait(timeout=5)
+        except Exception as e:
+            print(f"Error stopping JVM worker: {e}")
+
+class JvmWorkerPool:
+    def __init__(self, size):
+        self.size = size
+        self.disabled = False
+        self.started = 0
+        self.recycled = 0
+        self._idle = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._build_lock = threading.Lock()
+        self._classpath = None
+        self._kotlin_home = None
+
+    def _ensure_built(self):
+        with self._build_lock:
+            if self._classpath is not None or self.disabled:
+                return self._classpath
+            digest = hashlib.sha256(JVM_WORKER_SOURCE.encode("utf-8")).hexdigest()[:12]
+            build_dir = os.path.join(tempfile.gettempdir(), f"jvm-worker-{digest}")
+            if not os.path.exists(os.path.join(build_dir, "JvmWorker.class")):
+                os.makedirs(build_dir, exist_ok=True)
+                source_path = os.path.join(build_dir, "JvmWorker.java")
+                with open(source_path, 'w') as f:
+                    f.write(JVM_WORKER_SOURCE)
+                try:
+                    build = subprocess.run(['javac', '-d', build_dir, source_path], capture_output=True, text=True, timeout=60)
+                except (OSError, subprocess.TimeoutExpired) as e:
+                    build = None
+                    print(f"JVM worker build failed: {e}")
+                if build is None or build.returncode != 0:
+                    if build is not None:
+                        print(f"JVM worker build failed:\n{build.stderr}")
+                    self.disabled = True
+                    return None
+            classpath = [build_dir]
+            self._kotlin_home = find_kotlin_home()
+            if self._kotlin_home:
+                lib = os.path.join(self._kotlin_home, "lib")
+                classpath += [os.path.join(lib, jar) for jar in KOTLIN_COMPILER_JARS if os.path.exists(os.path.join(lib, jar))]
+            self._classpath = os.pathsep.join(classpath)
+            return self._classpath
+
+    def _checkout(self):
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = None
+        if worker is not None and worker.alive():
+            return worker
+        try:
+            worker = JvmWorker(self._classpath, self._kotlin_home)
+            self.started += 1
+            return worker
+        except (OSError, RuntimeError) as e:
+            print(f"Could not start JVM worker: {e}")
+            return None
+
+    def _checkin(self, worker):
+        if (not worker.alive() or worker.jobs >= JVM_WORKER_MAX_JOBS
+                or worker.heap_bytes > JVM_WORKER_MAX_HEAP_MB * 1024 * 1024):
+            worker.close()
+            self.recycled += 1
         else:
-            code = code.replace(call, "''", 1)
-    old_stdout = sys.stdout
-    sys.stdout = captured = io.StringIO()
+            self._idle.put(worker)
+
+    def run(self, kind, main_class, source, compile_timeout=15, run_timeout=10):
+        if self.disabled or not self._ensure_built():
+            return None
+        with self._slots:
+            worker = self._checkout()
+            if worker is None:
+                return None
+            if not worker.supports.get(kind):
+                self._checkin(worker)
+                return None
+            result = None
+            try:
+                result = worker.run(kind, main_class, source, compile_timeout, run_timeout)
+                return result
+            finally:
+                if result is not None and result[0] == "TIMEOUT":
+                    # A timed-out job may still be spinning inside the worker, so never hand it out again.
+                    worker.close()
+                    self.recycled += 1
+                else:
+                    self._checkin(worker)
+
+jvm_pool = JvmWorkerPool(JVM_POOL_SIZE)
+
+def run_in_jvm_pool(kind, code, main_class):
+    if not JVM_CLASS_NAME.fullmatch(main_class):
+        return f"❌ Error: '{main_class}' is not a valid Java class name."
+    if not JVM_POOL_ENABLED:
+        return None
+    result = jvm_pool.run(kind, main_class, code)
+    if result is None:
+        return None
+    status, stdout, stderr = result
+    if status == "OK":
+        return stdout or "✅ Ran successfully, no output."
+    if status == "COMPILE_ERROR":
+        return f"❌ Compilation Error:\n{stderr}"
+    if status == "RUNTIME_ERROR":
+        return f"❌ Runtime Error:\n{stderr}"
+    if status == "TIMEOUT":
+        return "❌ Execution timed out."
+    if status == "TRUNCATED":
+        return (stdout or stderr) + truncation_marker()
+    if status == "EXITED":
+        output = stdout + (f"\n{stderr}" if stdout and stderr else stderr)
+        return output or "✅ Program exited, no output."
+    # Worker-internal failure: let the caller fall back to the cold toolchain.
+    return None
+
+MISSING_TOOL_MESSAGES = {
+    "ruby": "❌ Error: Ruby interpreter is not installed or not in your system's PATH.",
+    "node": "❌ Error: Node.js is not installed or not in your system's PATH. Please install it to execute JavaScript code.",
+    "tsc": "❌ Error: TypeScript compiler ('tsc') is not installed. Please install it globally via `npm install -g typescript`.",
+}
+
+class CompilationError(Exception):
+    pass
+
+class BuiltProgram:
+    def __init__(self, command, cwd, memory_limit_mb=None, env=None):
+        self.command = command
+        self.cwd = cwd
+        self.memory_limit_mb = memory_limit_mb
+        self.env = env
+
+    def run(self, stdin_text=None, timeout=10):
+        return run_limited(self.command, timeout=timeout, cwd=self.cwd, input_text=stdin_text,
+                           memory_limit_mb=self.memory_limit_mb, env=self.env)
+
+    def measure(self, stdin_text=None, timeout=10):
+        return run_limited(self.command, timeout=timeout, cwd=self.cwd, input_text=stdin_text,
+                           memory_limit_mb=self.memory_limit_mb, env=self.env, measure=True)
+
+    def spawn(self):
+        return subprocess.Popen(
+            self.command,
+            cwd=self.cwd,
+            env=self.env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            preexec_fn=_limit_resources(self.memory_limit_mb) if os.name == "posix" else None,
+            start_new_session=True,
+        )
+
+def run_built_program(builder, code, label, main_class=None):
+    temp_dir = tempfile.mkdtemp()
     try:
-        exec(code, {})
-        return captured.getvalue().strip() or "✅ Ran successfully."
+        program = builder(code, temp_dir, main_class)
+        report_stage("running")
+        run_result = program.run()
+        if run_result.returncode != 0:
+            return f"❌ Runtime Error:\n{run_result.stderr}"
+        return run_result.stdout or "✅ Ran successfully, no output."
+    except CompilationError as e:
+        return f"❌ Compilation Error:\n{e}"
+    except FileNotFoundError as e:
+        return MISSING_TOOL_MESSAGES.get(e.filename, f"❌ Execution error: {str(e)}")
+    except subprocess.TimeoutExpired:
+        return "❌ Execution timed out."
+    except Exception as e:
+        return f"❌ Execution error: {str(e)}"
     finally:
-        sys.stdout = old_stdout
+        try:
+            shutil.rmtree(temp_dir)
+        except Exception as e:
+            print(f"Error during {label} cleanup: {e}")
 
 def execute_java_code(code, main_class):
-    temp_dir = tempfile.mkdtemp()
+    pooled = run_in_jvm_pool("JAVA", code, main_class)
+    if pooled is not None:
+        return pooled
+    return run_built_program(build_java, code, "Java", main_class)
+
+def build_java(code, temp_dir, main_class):
+    if not JVM_CLASS_NAME.fullmatch(main_class):
+        raise CompilationError(f"'{main_class}' is not a valid Java class name.")
     file_path = os.path.join(temp_dir, f"{main_class}.java")
+    with open(file_path, 'w') as f:
+        f.write(code)
+    compile_command = ['javac', file_path]
+    report_stage("compiling")
+    compile = run_limited(compile_command, timeout=15, cwd=temp_dir)
+    if compile.returncode != 0:
+        raise CompilationError(compile.stderr)
+    # The JVM and V8 reserve far more address space than they use, so cap their heaps instead of RLIMIT_AS.
+    return BuiltProgram(['java', f'-Xmx{EXEC_MEMORY_LIMIT_MB}m', '-cp', temp_dir, main_class], temp_dir)
+
+ARTIFACT_CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ai-debugger-artifacts"))
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+_toolchain_versions = {}
+
+def toolchain_version(command):
+    key = tuple(command)
+    if key not in _toolchain_versions:
+        try:
+            probe = subprocess.run(command, capture_output=True, text=True, timeout=10)
+            _toolchain_versions[key] = (probe.stdout or probe.stderr).strip().split("\n")[0]
+        except (OSError, subprocess.TimeoutExpired):
+            _toolchain_versions[key] = "unknown"
+    return _toolchain_versions[key]
+
+class ArtifactCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, language, version, flags, source):
+        payload = "\0".join([language, version, " ".join(flags), source])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def fetch(self, key, destination):
+        path = os.path.join(self.directory, key)
+        try:
+            # Copy rather than hard-link: a program that writes to its own file must not change the cached entry.
+            shutil.copyfile(path, destination)
+            os.chmod(destination, 0o755)
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key, artifact_path):
+        path = os.path.join(self.directory, key)
+        staging = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}")
+        try:
+            shutil.copy2(artifact_path, staging)
+            os.chmod(staging, 0o555)
+            os.replace(staging, path)
+        except OSError as e:
+            print(f"Could not cache build artifact: {e}")
+            if os.path.exists(staging):
+                os.remove(staging)
+            return
+        with self._lock:
+            self.stores += 1
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+artifact_cache = ArtifactCache(ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_BYTES)
+
+CPP_FLAGS = []
+RUST_FLAGS = []
+GO_FLAGS = []
+TYPESCRIPT_FLAGS = []
+
+def execute_cpp_code(code):
+    return run_built_program(build_cpp, code, "C++")
+
+def build_cpp(code, temp_dir, main_class=None, flags=None):
+    flags = CPP_FLAGS if flags is None else flags
+    source_path = os.path.join(temp_dir, "main.cpp")
+    executable_path = os.path.join(temp_dir, "main")
+    cache_key = artifact_cache.key("cpp", toolchain_version(['g++', '--version']), flags, code)
+    if not artifact_cache.fetch(cache_key, executable_path):
+        with open(source_path, 'w') as f:
+            f.write(code)
+        compile_command = ['g++', *flags, source_path, '-o', executable_path]
+        report_stage("compiling")
+        compile_result = run_limited(compile_command, timeout=15, cwd=temp_dir)
+        if compile_result.returncode != 0:
+            raise CompilationError(compile_result.stderr)
+        artifact_cache.store(cache_key, executable_path)
+    return BuiltProgram([executable_path], temp_dir, memory_limit_mb=EXEC_MEMORY_LIMIT_MB)
+
+def execute_go_code(code):
+    return run_built_program(build_go, code, "Go")
+
+def build_go(code, temp_dir, main_class=None):
+    source_path = os.path.join(temp_dir, "main.go")
+    executable_path = os.path.join(temp_dir, "main")
+    cache_key = artifact_cache.key("go", toolchain_version(['go', 'version']), GO_FLAGS, code)
+    if not artifact_cache.fetch(cache_key, executable_path):
+        with open(source_path, 'w') as f:
+            f.write(code)
+        compile_command = ['go', 'build', *GO_FLAGS, '-o', executable_path, source_path]
+        report_stage("compiling")
+        compile_result = run_limited(compile_command, timeout=15, cwd=temp_dir)
+        if compile_result.returncode != 0:
+            raise CompilationError(compile_result.stderr)
+        artifact_cache.store(cache_key, executable_path)
+    # The Go runtime reserves address space up front, so rely on its soft memory limit instead of RLIMIT_AS.
+    run_env = {**os.environ, "GOMEMLIMIT": f"{EXEC_MEMORY_LIMIT_MB}MiB"}
+    return BuiltProgram([executable_path], temp_dir, env=run_env)
+
+def execute_rust_code(code):
+    return run_built_program(build_rust, code, "Rust")
+
+def build_rust(code, temp_dir, main_class=None):
+    source_path = os.path.join(temp_dir, "main.rs")
+    executable_path = os.path.join(temp_dir, "main")
+    cache_key = artifact_cache.key("rust", toolchain_version(['rustc', '--version']), RUST_FLAGS, code)
+    if not artifact_cache.fetch(cache_key, executable_path):
+        with open(source_path, 'w') as f:
+            f.write(code)
+        compile_command = ['rustc', *RUST_FLAGS, source_path, '-o', executable_path]
+        report_stage("compiling")
+        compile_result = run_limited(compile_command, timeout=15, cwd=temp_dir)
+        if compile_result.returncode != 0:
+            raise CompilationError(compile_result.stderr)
+        artifact_cache.store(cache_key, executable_path)
+    return BuiltProgram([executable_path], temp_dir, memory_limit_mb=EXEC_MEMORY_LIMIT_MB)
+
+def execute_ruby_code(code):
+    return run_built_program(build_ruby, code, "Ruby")
+
+def build_ruby(code, temp_dir, main_class=None):
+    source_path = os.path.join(temp_dir, "main.rb")
+    with open(source_path, 'w') as f:
+        f.write(code)
+    return BuiltProgram(['ruby', source_path], temp_dir, memory_limit_mb=EXEC_MEMORY_LIMIT_MB)
+
+def execute_kotlin_code(code, main_class):
+    pooled = run_in_jvm_pool("KOTLIN", code, main_class)
+    if pooled is not None:
+        return pooled
+    return run_built_program(build_kotlin, code, "Kotlin", main_class)
+
+def build_kotlin(code, temp_dir, main_class):
+    source_path = os.path.join(temp_dir, f"{main_class}.kt")
+    output_jar = os.path.join(temp_dir, f"{main_class}.jar")
+    with open(source_path, 'w') as f:
+        f.write(code)
+    compile_command = ['kotlinc', source_path, '-include-runtime', '-d', output_jar]
+    report_stage("compiling")
+    compile_result = run_limited(compile_command, timeout=15, cwd=temp_dir)
+    if compile_result.returncode != 0:
+        raise CompilationError(compile_result.stderr)
+    return BuiltProgram(['java', f'-Xmx{EXEC_MEMORY_LIMIT_MB}m', '-jar', output_jar], temp_dir)
+
+def execute_arduino_code(code):
+    temp_dir = tempfile.mkdtemp()
+    sketch_dir = os.path.join(temp_dir, "sketch")
+    os.makedirs(sketch_dir)
+    sketch_file = os.path.join(sketch_dir, "sketch.ino")
     try:
-        with open(file_path, 'w') as f:
+        with open(sketch_file, 'w') as f:
             f.write(code)
-        compile_command = ['javac', file_path]
-        compile = subprocess.run(compile_command, cwd=temp_dir, capture_output=True, text=True, timeout=15)
+        compile_command = ['arduino-cli', 'compile', '--fqbn', 'arduino:avr:uno', sketch_dir]
+        report_stage("compiling")
+        compile = run_limited(compile_command, timeout=30)
         if compile.returncode != 0:
-            return f"❌ Compilation Error:\n{compile.stderr}"
-        run_command = ['java', '-cp', temp_dir, main_class]
-        run = subprocess.run(run_command, capture_output=True, text=True, timeout=10)
-        if run.returncode != 0:
-            return f"❌ Runtime Error:\n{run.stderr}"
-        return run.stdout or "✅ Ran successfully, no output."
+            return f"❌ Compilation Error (Arduino CLI):\n{compile.stderr}"
+        return "✅ Arduino code compiled successfully."
     except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
+        return "❌ Arduino compilation timed out."
     except Exception as e:
-        return f"❌ Execution error: {str(e)}"
+        return f"❌ Error during Arduino compilation: {str(e)}"
     finally:
         try:
             shutil.rmtree(temp_dir)
         except Exception as e:
-            print(f"Error during Java cleanup: {e}")
+            print(f"Error during Arduino cleanup: {e}")
 
-def execute_cpp_code(code):
+def execute_verilog_code(code, language):
     temp_dir = tempfile.mkdtemp()
-    source_path = os.path.join(temp_dir, "main.cpp")
-    executable_path = os.path.join(temp_dir, "main")
+    file_extension = ".v" if language in ["verilog"] else ".sv"
+    file_path = os.path.join(temp_dir, f"design{file_extension}")
+    output_vvp = os.path.join(temp_dir, "a.out")
     try:
-        with open(source_path, 'w') as f:
+        with open(file_path, 'w') as f:
             f.write(code)
-        compile_command = ['g++', source_path, '-o', executable_path]
-        compile_result = subprocess.run(compile_command, cwd=temp_dir, capture_output=True, text=True, timeout=15)
+        compile_command = ['iverilog', '-o', output_vvp, file_path]
+        report_stage("compiling")
+        compile_result = run_limited(compile_command, timeout=15, cwd=temp_dir)
         if compile_result.returncode != 0:
             return f"❌ Compilation Error:\n{compile_result.stderr}"
-        run_command = [executable_path]
-        run_result = subprocess.run(run_command, cwd=temp_dir, capture_output=True, text=True, timeout=10)
-        if run_result.returncode != 0:
-            return f"❌ Runtime Error:\n{run_result.stderr}"
-        return run_result.stdout or "✅ Ran successfully, no output."
+        if "initial begin" in code or "always_ff" in code or "always_comb" in code or "program " in code:
+            run_command = ['vvp', output_vvp]
+            report_stage("running")
+            run_result = run_limited(run_command, timeout=15, cwd=temp_dir, memory_limit_mb=EXEC_MEMORY_LIMIT_MB)
+            if run_result.returncode != 0:
+                return f"❌ Runtime Error (Simulation):\n{run_result.stderr}"
+            return run_result.stdout or "✅ Verilog/SystemVerilog/UVM compiled and ran successfully (no output to display)."
+        else:
+            return "✅ Verilog/SystemVerilog/UVM compiled successfully (no testbench found for simulation)."
     except subprocess.TimeoutExpired:
         return "❌ Execution timed out."
     except Exception as e:
-        return f"❌ Execution error: {str(e)}"
+        return f"❌ Error: {str(e)}"
     finally:
         try:
             shutil.rmtree(temp_dir)
         except Exception as e:
-            print(f"Error during C++ cleanup: {e}")
+            print(f"Error during Verilog cleanup: {e}")
+
+def execute_javascript_code(code):
+    return run_built_program(build_javascript, code, "JavaScript")
+
+def build_javascript(code, temp_dir, main_class=None):
+    source_path = os.path.join(temp_dir, "main.js")
+    with open(source_path, 'w') as f:
+        f.write(code)
+    return BuiltProgram(['node', f'--max-old-space-size={EXEC_MEMORY_LIMIT_MB}', source_path], temp_dir)
+
+def execute_typescript_code(code):
+    return run_built_program(build_typescript, code, "TypeScript")
+
+def build_typescript(code, temp_dir, main_class=None):
+    source_path = os.path.join(temp_dir, "main.ts")
+    output_path = os.path.join(temp_dir, "main.js")
+    cache_key = artifact_cache.key("typescript", toolchain_version(['tsc', '-v']), TYPESCRIPT_FLAGS, code)
+    if not artifact_cache.fetch(cache_key, output_path):
+        with open(source_path, 'w') as f:
+            f.write(code)
+        compile_command = ['tsc', *TYPESCRIPT_FLAGS, '--outFile', output_path, source_path]
+        report_stage("compiling")
+        compile_result = run_limited(compile_command, timeout=15, cwd=temp_dir)
+        if compile_result.returncode != 0:
+            raise CompilationError(compile_result.stderr)
+        artifact_cache.store(cache_key, output_path)
+    return BuiltProgram(['node', f'--max-old-space-size={EXEC_MEMORY_LIMIT_MB}', output_path], temp_dir)
+
+SQL_ROW_LIMIT = int(os.getenv("SQL_ROW_LIMIT", 200))
+SQL_STATEMENT_TIMEOUT = float(os.getenv("SQL_STATEMENT_TIMEOUT", 5))
+SQL_INDEX_MAX_COLUMNS = int(os.getenv("SQL_INDEX_MAX_COLUMNS", 3))
+SQL_ANALYSIS_TTL = int(os.getenv("SQL_ANALYSIS_TTL", 30))
+SQL_ANALYSIS_CACHE_SIZE = int(os.getenv("SQL_ANALYSIS_CACHE_SIZE", 32))
+SQL_QUERY_PREFIX = re.compile(r'^(?:\s+|--[^\n]*\n?|/\*.*?\*/)*(SELECT|WITH)\b', re.IGNORECASE | re.DOTALL)
+SQL_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?((?:\w+\.)?\w+)(?: AS (\w+))?$')
+SQL_TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN)\s+(?:(\w+)\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+SQL_EQUALITY_COLUMN = re.compile(r'(?:\b(\w+)\.)?\b([A-Za-z_]\w*)\s*(?:==?|\bIN\b|\bIS\b)|(?:==?)\s*(?:\b(\w+)\.)?\b([A-Za-z_]\w*)', re.IGNORECASE)
+SQL_RANGE_COLUMN = re.compile(r'(?:\b(\w+)\.)?\b([A-Za-z_]\w*)\s*(?:[<>]=?|\bBETWEEN\b|\bLIKE\b)', re.IGNORECASE)
+SQL_ORDER_BY = re.compile(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|$)', re.IGNORECASE | re.DOTALL)
+SQL_KEYWORDS = {"WHERE", "JOIN", "ON", "LEFT", "RIGHT", "INNER", "OUTER", "CROSS", "NATURAL", "FULL", "ORDER", "GROUP",
+                "LIMIT", "HAVING", "UNION", "EXCEPT", "INTERSECT", "USING", "WINDOW", "SET", "VALUES", "AND", "OR"}
+
+SQL_FIXTURE_DIR = os.getenv("SQL_FIXTURE_DIR", os.path.join(tempfile.gettempdir(), "ai-debugger-sql-fixtures"))
+SQL_FIXTURE_VERSION = 1
+SQL_FIXTURE_SEED = int(os.getenv("SQL_FIXTURE_SEED", 1234))
+# Each size is its own database file and nothing evicts them, so only a few fixed sizes are offered.
+SQL_FIXTURE_SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+SQL_FIXTURE_MMAP_SIZE = int(os.getenv("SQL_FIXTURE_MMAP_SIZE", 1 << 30))
+SQL_FIXTURE_BATCH_ROWS = 50_000
+SQL_FIXTURE_DIRECTIVE = re.compile(r'^[ \t]*--[ \t]*@fixture[ \t]+(?:rows[ \t]*=[ \t]*)?(\d[\d_,]*|\d+(?:\.\d+)?[kKmM])[ \t]*(?:\n|$)',
+                                   re.MULTILINE)
+SQL_FIXTURE_SCHEMA = """
+CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL, country TEXT NOT NULL,
+                        created_at TEXT NOT NULL);
+CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT NOT NULL, category TEXT NOT NULL, price REAL NOT NULL);
+CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER NOT NULL REFERENCES customers(id),
+                     product_id INTEGER NOT NULL REFERENCES products(id), quantity INTEGER NOT NULL,
+                     status TEXT NOT NULL, ordered_at TEXT NOT NULL);
+"""
+SQL_FIXTURE_COUNTRIES = ["US", "DE", "IN", "BR", "JP", "GB", "FR", "CA", "NG", "AU", "MX", "KR"]
+SQL_FIXTURE_CATEGORIES = ["books", "electronics", "garden", "toys", "grocery", "clothing", "sports", "beauty"]
+SQL_FIXTURE_STATUSES = ["pending", "paid", "shipped", "delivered", "cancelled", "refunded"]
+SQL_FIXTURE_EPOCH = 1577836800
+fixture_flight = SingleFlight("sql_fixture")
+sql_analysis_flight = SingleFlight("sql_analysis")
+_sql_analyses = OrderedDict()
+_sql_analyses_lock = threading.Lock()
+
+def parse_fixture_rows(code):
+    match = SQL_FIXTURE_DIRECTIVE.search(code)
+    if match is None:
+        return None
+    text = match.group(1).replace("_", "").replace(",", "")
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1].lower(), 1)
+    rows = int(float(text[:-1]) * multiplier) if multiplier > 1 else int(text)
+    if rows not in SQL_FIXTURE_SIZES.values():
+        raise ValueError(f"Fixture size must be one of {', '.join(SQL_FIXTURE_SIZES)}.")
+    return rows
+
+def sql_fixture_tables(rows):
+    return {"orders": rows, "customers": max(rows // 10, 1), "products": max(rows // 1000, 100)}
+
+def sql_fixture_path(rows):
+    return os.path.join(SQL_FIXTURE_DIR, f"fixture-v{SQL_FIXTURE_VERSION}-seed{SQL_FIXTURE_SEED}-{rows}.db")
+
+def ensure_sql_fixture(rows):
+    path = sql_fixture_path(rows)
+    if os.path.exists(path):
+        return path
+    return fixture_flight.do(path, lambda: build_sql_fixture(rows, path))
+
+def build_sql_fixture(rows, path):
+    if os.path.exists(path):
+        return path
+    os.makedirs(SQL_FIXTURE_DIR, exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    counts = sql_fixture_tables(rows)
+    rng = random.Random(SQL_FIXTURE_SEED)
+    started = time.perf_counter()
+
+    def timestamp():
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(SQL_FIXTURE_EPOCH + rng.randrange(4 * 365 * 86400)))
+
+    def batches(make_row, count):
+        for start in range(1, count + 1, SQL_FIXTURE_BATCH_ROWS):
+            yield [make_row(row_id) for row_id in range(start, min(start + SQL_FIXTURE_BATCH_ROWS, count + 1))]
+
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SQL_FIXTURE_SCHEMA)
+        for batch in batches(lambda i: (i, f"Product {i}", rng.choice(SQL_FIXTURE_CATEGORIES),
+                                        round(rng.uniform(1, 500), 2)), counts["products"]):
+            conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?)", batch)
+        for batch in batches(lambda i: (i, f"Customer {i}", f"customer{i}@example.com", rng.choice(SQL_FIXTURE_COUNTRIES),
+                                        timestamp()), counts["customers"]):
+            conn.executemany("INSERT INTO customers VALUES (?, ?, ?, ?, ?)", batch)
+        for batch in batches(lambda i: (i, rng.randint(1, counts["customers"]), rng.randint(1, counts["products"]),
+                                        rng.randint(1, 5), rng.choice(SQL_FIXTURE_STATUSES), timestamp()),
+                             counts["orders"]):
+            conn.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)", batch)
+        conn.commit()
+        # Planner statistics make the query plans match what a production database of this size would choose.
+        conn.execute("ANALYZE")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(temp_path)
+        raise
+    conn.close()
+    os.replace(temp_path, path)
+    print(f"Built SQL fixture with {rows} orders in {time.perf_counter() - started:.1f}s: {path}")
+    return path
+
+def attach_sql_fixture(conn, rows):
+    path = ensure_sql_fixture(rows)
+    # immutable=1 skips locking and change detection, so concurrent runs share the file and its page cache.
+    conn.execute("ATTACH DATABASE ? AS fixture", (f"file:{urllib.parse.quote(path)}?mode=ro&immutable=1",))
+    conn.execute(f"PRAGMA fixture.mmap_size = {SQL_FIXTURE_MMAP_SIZE}")
+    return {"rows": rows, "tables": sql_fixture_tables(rows)}
+
+def split_sql_statements(code):
+    # Splitting on ";" alone breaks semicolons inside strings and trigger bodies; complete_statement knows both.
+    statements = []
+    buffer = ""
+    pieces = code.split(";")
+    for piece in pieces[:-1]:
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(" \t\r\n;"):
+                statements.append(buffer.strip())
+            buffer = ""
+    trailing = (buffer + pieces[-1]).strip()
+    if trailing:
+        statements.append(trailing)
+    return statements
+
+def query_plan(conn, statement):
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+    depth = {0: -1}
+    plan = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        plan.append((depth[node_id], detail))
+    return plan
+
+def full_scans(plan):
+    scans = []
+    for _, detail in plan:
+        match = SQL_FULL_SCAN.match(detail)
+        if match:
+            scans.append(match.group(2) or match.group(1))
+    return scans
+
+def table_aliases(statement):
+    # Maps every name the plan may use for a table (bare, schema-qualified or alias) to its (schema, table).
+    aliases = {}
+    for schema, table, alias in SQL_TABLE_REFERENCE.findall(statement):
+        reference = (schema or None, table)
+        aliases[table] = reference
+        if schema:
+            aliases[f"{schema}.{table}"] = reference
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = reference
+    return aliases
+
+def index_columns(statement, table, alias, columns, needs_order):
+    names = {table.lower(), alias.lower()}
+    candidates = []
+
+    def add(qualifier, column):
+        if column.lower() in columns and (not qualifier or qualifier.lower() in names) and column not in candidates:
+            candidates.append(columns[column.lower()])
+
+    for match in SQL_EQUALITY_COLUMN.finditer(statement):
+        add(match.group(1) or match.group(3), match.group(2) or match.group(4))
+    for qualifier, column in SQL_RANGE_COLUMN.findall(statement):
+        add(qualifier, column)
+    order = SQL_ORDER_BY.search(statement) if needs_order else None
+    if order:
+        for term in order.group(1).split(","):
+            parts = term.strip().split()[0].rstrip(";").split(".") if term.strip() else []
+            if parts:
+                add(parts[0] if len(parts) > 1 else "", parts[-1])
+    return candidates[:SQL_INDEX_MAX_COLUMNS]
+
+def suggest_indexes(conn, statement, plan):
+    advice = []
+    aliases = table_aliases(statement)
+    needs_order = any(detail.startswith("USE TEMP B-TREE FOR ORDER BY") for _, detail in plan)
+    for scan in full_scans(plan):
+        schema, table = aliases.get(scan) or (tuple(scan.split(".", 1)) if "." in scan else (None, scan))
+        prefix = f"{schema}." if schema else ""
+        display = f"{prefix}{table}"
+        columns = {row[1].lower(): row[1] for row in conn.execute(f'PRAGMA {prefix}table_info("{table}")')}
+        if not columns:
+            continue
+        candidates = index_columns(statement, table, scan.split(".")[-1], columns, needs_order)
+        if not candidates:
+            advice.append({"table": display, "index": None, "verified": None,
+                           "read_only": False,
+                           "note": f"Full table scan of {display}; there is no filter on it, so every row is read."})
+            continue
+        name = f"idx_{table}_{'_'.join(candidates)}".lower()
+        note = f"Full table scan of {display}, which the query filters, joins or sorts on {', '.join(candidates)}."
+        if is_fixture_table(conn, schema, table):
+            advice.append({"table": display, "index": f'CREATE INDEX {name} ON {table}({", ".join(candidates)});',
+                           "verified": None, "read_only": True,
+                           "note": f"{note} {display} is in the read-only fixture database, so it cannot take indexes here."})
+            continue
+        verified = verify_index(conn, statement, schema, table, scan, name, candidates)
+        if verified is False:
+            # The planner keeps scanning even with the index (e.g. the outer table of a join), so it would not help.
+            continue
+        advice.append({"table": display, "index": f'CREATE INDEX {prefix}{name} ON {table}({", ".join(candidates)});',
+                       "verified": verified, "read_only": False, "note": note})
+    return advice
+
+def is_fixture_table(conn, schema, table):
+    # CREATE INDEX only works on temp and main; unqualified names resolve there before attached databases.
+    if schema:
+        return schema.lower() not in ("temp", "main")
+    for writable in ("temp", "main"):
+        if conn.execute(f'PRAGMA {writable}.table_info("{table}")').fetchone() is not None:
+            return False
+    return True
+
+def verify_index(conn, statement, schema, table, scan, name, columns):
+    # DDL is transactional in SQLite, so try the index inside a savepoint and look at the new plan.
+    try:
+        conn.execute("SAVEPOINT index_advice")
+    except sqlite3.Error:
+        return None
+    try:
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        conn.execute(f'CREATE INDEX {schema + "." if schema else ""}"{name}" ON "{table}" ({quoted})')
+        return scan not in full_scans(query_plan(conn, statement))
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.execute("ROLLBACK TO index_advice")
+        conn.execute("RELEASE index_advice")
+
+def run_sql_statement(conn, statement, deadline):
+    result = {"sql": statement, "columns": None, "rows": [], "row_count": 0, "truncated": False,
+              "time_ms": None, "plan": [], "advice": [], "error": None}
+    started = time.perf_counter()
+    deadline[0] = time.monotonic() + SQL_STATEMENT_TIMEOUT
+    try:
+        cursor = conn.execute(statement)
+        if cursor.description is not None:
+            result["columns"] = [desc[0] for desc in cursor.description]
+            # Keep stepping past the cap so the timing and row count cover the whole query.
+            for row in cursor:
+                if result["row_count"] < SQL_ROW_LIMIT:
+                    result["rows"].append(row)
+                result["row_count"] += 1
+            result["truncated"] = result["row_count"] > SQL_ROW_LIMIT
+    except sqlite3.Error as e:
+        result["error"] = "Statement timed out." if time.monotonic() > deadline[0] else str(e)
+    result["time_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    if result["error"] is None and SQL_QUERY_PREFIX.match(statement):
+        deadline[0] = time.monotonic() + SQL_STATEMENT_TIMEOUT
+        try:
+            result["plan"] = query_plan(conn, statement)
+            result["advice"] = suggest_indexes(conn, statement, result["plan"])
+        except sqlite3.Error as e:
+            print(f"Could not analyze query plan: {e}")
+    return result
+
+def analyze_sql(code):
+    fixture_rows = parse_fixture_rows(code)
+    statements = split_sql_statements(SQL_FIXTURE_DIRECTIVE.sub("", code))
+    results = []
+    conn = sqlite3.connect(':memory:', isolation_level=None, uri=True)
+    deadline = [time.monotonic() + SQL_STATEMENT_TIMEOUT]
+    conn.set_progress_handler(lambda: int(time.monotonic() > deadline[0]), 10000)
+    try:
+        fixture = attach_sql_fixture(conn, fixture_rows) if fixture_rows else None
+        for statement in statements:
+            result = run_sql_statement(conn, statement, deadline)
+            results.append(result)
+            if result["error"]:
+                break
+    finally:
+        conn.close()
+    return {"fixture": fixture, "statements": results}
+
+def shared_sql_analysis(code):
+    # The fix prompt and the concurrent baseline run need the same analysis, so run the statements once per request.
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    with _sql_analyses_lock:
+        item = _sql_analyses.get(key)
+        if item is not None and time.monotonic() - item[0] < SQL_ANALYSIS_TTL:
+            return item[1]
+    analysis = sql_analysis_flight.do(key, lambda: analyze_sql(code))
+    with _sql_analyses_lock:
+        _sql_analyses[key] = (time.monotonic(), analysis)
+        _sql_analyses.move_to_end(key)
+        while len(_sql_analyses) > SQL_ANALYSIS_CACHE_SIZE:
+            _sql_analyses.popitem(last=False)
+    return analysis
+
+def describe_sql_fixture(fixture):
+    tables = ", ".join(f"{table} ({count:,} rows)" for table, count in fixture["tables"].items())
+    return f"Fixture database attached read-only: {tables}"
+
+def format_sql_results(analysis):
+    output = [f"🗄️ {describe_sql_fixture(analysis['fixture'])}"] if analysis["fixture"] else []
+    for result in analysis["statements"]:
+        output.append(f"Executing query: {result['sql']}")
+        if result["error"]:
+            output.append(f"❌ SQL Error: {result['error']}")
+            break
+        if result["columns"] is not None:
+            if result["rows"]:
+                header = " | ".join(result["columns"])
+                output.append("--- Results ---")
+                output.append(header)
+                output.append("-" * len(header))
+                for row in result["rows"]:
+                    output.append(" | ".join(map(str, row)))
+                if result["truncated"]:
+                    output.append(f"... {result['row_count'] - len(result['rows'])} more rows not shown "
+                                  f"({result['row_count']} total)")
+                output.append("---------------")
+            else:
+                output.append("✅ Query executed successfully, no rows returned.")
+        else:
+            output.append("✅ Statement executed successfully.")
+        output.append(f"⏱ {result['time_ms']} ms")
+        if result["plan"]:
+            output.append("Query plan:")
+            output.extend(f"{'  ' * (depth + 1)}{detail}" for depth, detail in result["plan"])
+        for advice in result["advice"]:
+            output.append(f"{'⚠️' if advice['index'] else 'ℹ️'} {advice['note']}")
+            if advice["index"]:
+                if advice["read_only"]:
+                    output.append(f"   Index for your own schema (not checked here): {advice['index']}")
+                    continue
+                check = " (checked: the plan no longer scans the table)" if advice["verified"] else ""
+                output.append(f"   Suggested index: {advice['index']}{check}")
+    return "\n".join(output)
+
+def execute_sql_code(code):
+    report_stage("running")
+    try:
+        analysis = shared_sql_analysis(code)
+    except ValueError as e:
+        return f"❌ {str(e)}"
+    except Exception as e:
+        return f"❌ An unexpected error occurred: {str(e)}"
+    if not analysis["statements"]:
+        return "✅ Ran successfully, no output."
+    return format_sql_results(analysis)
+
+def sql_prompt_values(code):
+    try:
+        # Analyze the code as the baseline run will see it so both share one analysis.
+        analysis = shared_sql_analysis(preprocess_code(code))
+    except Exception as e:
+        return {"measurements": f"Could not run the SQL: {str(e)}"}
+    lines = [describe_sql_fixture(analysis["fixture"])] if analysis["fixture"] else []
+    for number, result in enumerate(analysis["statements"], 1):
+        if result["error"]:
+            lines.append(f"{number}. error: {result['error']}")
+            continue
+        lines.append(f"{number}. {result['time_ms']} ms, {result['row_count']} rows")
+        lines.extend(f"   plan: {detail}" for _, detail in result["plan"])
+        for advice in result["advice"]:
+            if advice["read_only"]:
+                lines.append(f"   {advice['note']} Do not add CREATE INDEX for it to the code; "
+                             f"mention {advice['index']} in a comment instead.")
+            else:
+                lines.append(f"   {advice['note']}" + (f" Suggested: {advice['index']}" if advice["index"] else ""))
+    return {"measurements": "\n".join(lines) or "No statements ran."}
+
+FIX_FORMAT = """
+Format:
+<corrected_code>
+---EXPLANATION---
+<explanation>"""
+
+class PromptTemplate:
+    def __init__(self, text):
+        self.text = text + FIX_FORMAT
+        self.version = hashlib.sha256(self.text.encode("utf-8")).hexdigest()[:12]
+        self._parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(self.text)]
+
+    def render(self, **values):
+        return "".join(literal + (str(values[field]) if field is not None else "") for literal, field in self._parts)
+
+class Toolchain:
+    def __init__(self, command, label, missing):
+        self.command = command
+        self.label = label
+        self.missing = missing
+        self._available = None
+
+    def probe(self):
+        try:
+            subprocess.run(self.command, capture_output=True, text=True, check=True)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+
+    @property
+    def available(self):
+        if self._available is None:
+            self._available = shutil.which(self.command[0]) is not None
+        return self._available
+
+TOOLCHAINS = {
+    "java": Toolchain(["java", "-version"], "Java", "Java/Kotlin execution will not work."),
+    "kotlinc": Toolchain(["kotlinc", "-version"], "Kotlin", "Kotlin compilation will not work."),
+    "g++": Toolchain(["g++", "--version"], "g++", "C++ compilation will not work."),
+    "go": Toolchain(["go", "version"], "Go", "Go execution will not work."),
+    "rustc": Toolchain(["rustc", "--version"], "Rust", "Rust compilation will not work."),
+    "ruby": Toolchain(["ruby", "-v"], "Ruby", "Ruby execution will not work."),
+    "arduino-cli": Toolchain(["arduino-cli", "version"], "Arduino CLI", "Arduino compilation will not work."),
+    "iverilog": Toolchain(["iverilog", "-v"], "Icarus Verilog", "Verilog/SystemVerilog/UVM compilation will not work."),
+    "node": Toolchain(["node", "-v"], "Node.js", "JavaScript/TypeScript execution will not work."),
+    "tsc": Toolchain(["tsc", "-v"], "TypeScript compiler (tsc)", "TypeScript compilation will not work."),
+    "gprof": Toolchain(["gprof", "--version"], "gprof", "C++ profiles will not include hotspots."),
+    "perf": Toolchain(["perf", "--version"], "perf", "Profiles will not include hardware counters."),
+}
+
+class Language:
+    def __init__(self, name, template, executor, extension, mode, toolchains=(), prompt_values=None, runnable=True,
+                 builder=None, profiler=None):
+        self.name = name
+        self.template = template
+        self.executor = executor
+        self.builder = builder
+        self.profiler = profiler or (profile_built(builder) if builder else None)
+        self.extension = extension
+        self.mode = mode
+        self.toolchains = [TOOLCHAINS[tool] for tool in toolchains]
+        self._prompt_values = prompt_values
+        self.runnable = runnable
+
+    def prompt_values(self, code):
+        return self._prompt_values(code) if self._prompt_values else {}
+
+    def execute(self, code, test_inputs, java_main_class):
+        return self.executor(code, test_inputs, java_main_class)
+
+    def describe(self):
+        return {"name": self.name, "extension": self.extension, "mode": self.mode,
+                "template_version": self.template.version, "runnable": self.runnable,
+                "test_suites": self.builder is not None, "profiling": self.profiler is not None,
+                "available": all(tool.available for tool in self.toolchains)}
+
+def java_prompt_values(code):
+    class_match = re.search(r'public\s+class\s+(\w+)', code)
+    return {"main_class": class_match.group(1) if class_match else "Main"}
+
+def kotlin_main_class(code):
+    return "MainKt" if re.search(r'fun\s+main', code) else "Main"
+
+def snippet_note(language):
+    if language in ["django", "react"]:
+        note = f"✅ Code fixed successfully. Note: {language.capitalize()} requires a full project setup to run. The AI has provided the corrected snippet."
+    else:
+        note = f"✅ Code fixed successfully. To see this {language.upper()} code in action, you need to open it in a web browser. The execution panel shows the raw, corrected code."
+    return lambda code, test_inputs, java_main_class: note
+
+HDL_TEMPLATE = PromptTemplate("""Fix this {language} code:
+{code}
+Requirements:
+1. Correct syntax errors and logical issues.
+2. Ensure proper module/interface/class definition and port/variable declarations.
+3. Provide clear and concise comments where necessary.
+4. If it's a testbench, ensure it instantiates the DUT correctly and includes initial/always blocks for simulation.""")
+SCRIPT_TEMPLATE = PromptTemplate("""Fix this {language} code. 
+{code}
+Requirements:
+1. Correct syntax or logical errors.
+2. Ensure the code is runnable and produces expected output.
+3. Provide clear and concise comments where necessary.""")
+WEB_TEMPLATE = PromptTemplate("""Fix this {language} code.
+{code}
+Requirements:
+1. Correct syntax or logical errors.
+2. Ensure the code is well-structured and follows best practices.
+3. For React and Django, provide a runnable code snippet, but mention that a full project setup is required for real-world use.
+4. For HTML and CSS, provide a complete, well-formed code snippet.""")
+
+LANGUAGES = {language.name: language for language in [
+    Language("python", PromptTemplate("""Fix this Python code:
+{code}
+Requirements:
+1. Correct syntax or logical errors.
+2. Do not convert string to int unless explicitly necessary for the logic.
+3. Preserve operations like string multiplication (e.g., 'a' * 3).
+4. Ensure the code is runnable and produces expected output if inputs are provided."""),
+             lambda code, test_inputs, java_main_class: execute_python_code(code, test_inputs), ".py", "python",
+             builder=build_python, profiler=profile_python),
+    Language("java", PromptTemplate("""Fix this Java code:
+{code}
+Requirements:
+1. Include main class '{main_class}'
+2. Add necessary imports and fix syntax errors.
+3. Ensure the code is runnable."""),
+             lambda code, test_inputs, java_main_class: execute_java_code(code, java_main_class), ".java", "text/x-java",
+             ("java",), prompt_values=java_prompt_values, builder=build_java),
+    Language("cpp", PromptTemplate("""Fix this C++ code:
+{code}
+Requirements:
+1. Correct syntax and logical errors.
+2. Add necessary includes (e.g., #include <iostream>).
+3. Ensure the code is runnable."""),
+             lambda code, test_inputs, java_main_class: execute_cpp_code(code), ".cpp", "text/x-c++src", ("g++",),
+             builder=build_cpp, profiler=profile_cpp),
+    Language("go", PromptTemplate("""Fix this Go code:
+{code}
+Requirements:
+1. Correct syntax and logical errors.
+2. Add necessary imports and ensure proper package structure.
+3. Ensure the code is runnable."""),
+             lambda code, test_inputs, java_main_class: execute_go_code(code), ".go", "go", ("go",), builder=build_go),
+    Language("rust", PromptTemplate("""Fix this Rust code:
+{code}
+Requirements:
+1. Correct syntax and ownership errors.
+2. Add necessary use statements and ensure proper function signatures.
+3. Ensure the code is runnable and passes the borrow checker."""),
+             lambda code, test_inputs, java_main_class: execute_rust_code(code), ".rs", "rust", ("rustc",),
+             builder=build_rust, profiler=profile_built(build_rust, use_perf=True)),
+    Language("ruby", PromptTemplate("""Fix this Ruby code:
+{code}
+Requirements:
+1. Correct syntax and logical errors.
+2. Ensure the code is runnable.
+3. Provide clear and concise comments where necessary."""),
+             lambda code, test_inputs, java_main_class: execute_ruby_code(code), ".rb", "ruby", ("ruby",),
+             builder=build_ruby),
+    Language("kotlin", PromptTemplate("""Fix this Kotlin code:
+{code}
+Requirements:
+1. Correct syntax and logical errors.
+2. Add necessary imports.
+3. Ensure the code is runnable, typically with a main function."""),
+             lambda code, test_inputs, java_main_class: execute_kotlin_code(code, kotlin_main_class(code)), ".kt",
+             "text/x-java", ("kotlinc",), builder=build_kotlin),
+    Language("arduino", PromptTemplate("""Fix this Arduino code:
+{code}
+Requirements:
+1. Ensure setup() and loop() functions are correctly defined and present.
+2. Fix any syntax errors, logical issues, and add necessary includes (e.g., #include <Arduino.h>).
+3. Provide clear and concise comments where necessary."""),
+             lambda code, test_inputs, java_main_class: execute_arduino_code(code), ".ino", "text/x-c++src",
+             ("arduino-cli",)),
+    Language("verilog", HDL_TEMPLATE, lambda code, test_inputs, java_main_class: execute_verilog_code(code, "verilog"),
+             ".v", "verilog", ("iverilog",)),
+    Language("systemverilog", HDL_TEMPLATE,
+             lambda code, test_inputs, java_main_class: execute_verilog_code(code, "systemverilog"), ".sv", "verilog",
+             ("iverilog",)),
+    Language("uvm", HDL_TEMPLATE, lambda code, test_inputs, java_main_class: execute_verilog_code(code, "uvm"),
+             ".sv", "verilog", ("iverilog",)),
+    Language("javascript", SCRIPT_TEMPLATE, lambda code, test_inputs, java_main_class: execute_javascript_code(code),
+             ".js", "javascript", ("node",), builder=build_javascript, profiler=profile_node(build_javascript)),
+    Language("typescript", SCRIPT_TEMPLATE, lambda code, test_inputs, java_main_class: execute_typescript_code(code),
+             ".ts", "javascript", ("node", "tsc"), builder=build_typescript,
+             profiler=profile_node(build_typescript)),
+    Language("sql", PromptTemplate("""Analyze and fix this SQL code.
+{code}
+Measurements from running it statement by statement in SQLite (timings, query plans, full table scans):
+{measurements}
+Requirements:
+1. Fix any syntax errors.
+2. Suggest improvements for performance or clarity.
+3. Provide the corrected, runnable query or schema.
+4. Keep any "-- @fixture" line as it is; it selects the test database the measurements came from.
+5. Fixture tables are read-only and cannot take indexes; only add CREATE INDEX for tables the code creates itself."""),
+             lambda code, test_inputs, java_main_class: execute_sql_code(code), ".sql", "text/x-sql",
+             prompt_values=sql_prompt_values),
+    Language("html", WEB_TEMPLATE, snippet_note("html"),
+             ".html", "text/html", runnable=False),
+    Language("css", WEB_TEMPLATE, snippet_note("css"),
+             ".css", "text/css", runnable=False),
+    Language("django", WEB_TEMPLATE, snippet_note("django"),
+             ".py", "python", runnable=False),
+    Language("react", WEB_TEMPLATE, snippet_note("react"),
+             ".jsx", "javascript", runnable=False),
+]}
+LANGUAGE_MODES = {name: language.mode for name, language in LANGUAGES.items()}
+
+def get_language(name):
+    return LANGUAGES.get(name, LANGUAGES["python"])
+
+execution_flight = SingleFlight("execution")
 
-def execute_go_code(code):
-    temp_dir = tempfile.mkdtemp()
-    source_path = os.path.join(temp_dir, "main.go")
-    try:
-        with open(source_path, 'w') as f:
-            f.write(code)
-        run_command = ['go', 'run', source_path]
-        run_result = subprocess.run(run_command, cwd=temp_dir, capture_output=True, text=True, timeout=15)
-        if run_result.returncode != 0:
-            return f"❌ Runtime Error:\n{run_result.stderr}"
-        return run_result.stdout or "✅ Ran successfully, no output."
-    except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
-    except Exception as e:
-        return f"❌ Execution error: {str(e)}"
-    finally:
-        try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Error during Go cleanup: {e}")
+def execution_key(code, language, test_inputs, java_main_class):
+    payload = json.dumps([language, java_main_class, test_inputs or [], code])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-def execute_rust_code(code):
-    temp_dir = tempfile.mkdtemp()
-    source_path = os.path.join(temp_dir, "main.rs")
-    executable_path = os.path.join(temp_dir, "main")
+def validate_and_execute_code(code, language, test_inputs=None, java_main_class=None, clean=False):
+    key = execution_key(code, language, test_inputs, java_main_class)
+    return execution_flight.do(key, lambda: _validate_and_execute(code, language, test_inputs, java_main_class, clean))
+
+def _validate_and_execute(code, language, test_inputs, java_main_class, clean):
+    _stage_local.language = language
+    started = time.perf_counter()
     try:
-        with open(source_path, 'w') as f:
-            f.write(code)
-        compile_command = ['rustc', source_path, '-o', executable_path]
-        compile_result = subprocess.run(compile_command, cwd=temp_dir, capture_output=True, text=True, timeout=15)
-        if compile_result.returncode != 0:
-            return f"❌ Compilation Error:\n{compile_result.stderr}"
-        run_command = [executable_path]
-        run_result = subprocess.run(run_command, cwd=temp_dir, capture_output=True, text=True, timeout=10)
-        if run_result.returncode != 0:
-            return f"❌ Runtime Error:\n{run_result.stderr}"
-        return run_result.stdout or "✅ Ran successfully, no output."
-    except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
+        with timed("preprocess", language):
+            code = preprocess_code(code, clean)
+        output = _execute_for_language(code, language, test_inputs, java_main_class)
     except Exception as e:
-        return f"❌ Execution error: {str(e)}"
+        output = f"❌ Execution failed: {str(e)}"
     finally:
-        try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Error during Rust cleanup: {e}")
+        _finish_stage()
+        _stage_local.language = None
+    record_timing("execute", time.perf_counter() - started, language)
+    record_execution_outcome(language, output)
+    return output
 
-def execute_ruby_code(code):
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".rb", mode='w')
-    temp_file.write(code)
-    temp_file.close()
+def _execute_for_language(code, language, test_inputs, java_main_class):
+    entry = LANGUAGES.get(language)
+    if entry is None:
+        return None
+    return entry.execute(code, test_inputs, java_main_class)
+
+TEST_SUITE_MAX_CASES = int(os.getenv("TEST_SUITE_MAX_CASES", 100))
+TEST_CASE_TIMEOUT = int(os.getenv("TEST_CASE_TIMEOUT", 10))
+test_case_pool = ThreadPoolExecutor(max_workers=int(os.getenv("TEST_CASE_WORKERS", 4)), thread_name_prefix="test-case")
+CASE_SEPARATOR = re.compile(r'^===\s*$', re.MULTILINE)
+EXPECTED_SEPARATOR = re.compile(r'^---\s*$', re.MULTILINE)
+
+def parse_test_cases(text):
+    cases = []
+    for block in CASE_SEPARATOR.split(text.replace("\r\n", "\n")):
+        if not block.strip():
+            continue
+        parts = EXPECTED_SEPARATOR.split(block, 1)
+        cases.append({"input": parts[0].strip("\n"), "expected": parts[1].strip("\n") if len(parts) > 1 else None})
+    return cases
+
+def normalize_output(text):
+    return "\n".join(line.rstrip() for line in text.strip().split("\n"))
+
+def run_test_case(program, index, case):
+    stdin_text = case.get("input") or ""
+    if isinstance(stdin_text, list):
+        stdin_text = "\n".join(str(line) for line in stdin_text)
+    if stdin_text and not stdin_text.endswith("\n"):
+        stdin_text += "\n"
+    expected = case.get("expected")
+    result = {"name": case.get("name") or f"Case {index + 1}", "expected": expected, "output": "", "error": ""}
+    started = time.perf_counter()
     try:
-        run_command = ['ruby', temp_file.name]
-        run_result = subprocess.run(run_command, capture_output=True, text=True, timeout=10)
-        if run_result.returncode != 0:
-            return f"❌ Runtime Error:\n{run_result.stderr}"
-        return run_result.stdout or "✅ Ran successfully, no output."
-    except FileNotFoundError:
-        return "❌ Error: Ruby interpreter is not installed or not in your system's PATH."
+        run = program.run(stdin_text, TEST_CASE_TIMEOUT)
+        result["output"] = run.stdout
+        if run.returncode != 0:
+            result["status"] = "error"
+            result["error"] = run.stderr
+        elif expected is None:
+            result["status"] = "ran"
+        else:
+            result["status"] = "pass" if normalize_output(run.stdout) == normalize_output(expected) else "fail"
     except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
+        result["status"] = "timeout"
     except Exception as e:
-        return f"❌ Execution error: {str(e)}"
-    finally:
-        os.remove(temp_file.name)
+        result["status"] = "error"
+        result["error"] = str(e)
+    result["time_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
 
-def execute_kotlin_code(code, main_class):
+def run_test_suite(code, language, cases, java_main_class=None, clean=False):
+    entry = LANGUAGES.get(language)
+    if entry is None or entry.builder is None:
+        return {"error": f"❌ Test suites are not supported for {language}.", "cases": []}
+    if len(cases) > TEST_SUITE_MAX_CASES:
+        return {"error": f"❌ Too many test cases (limit {TEST_SUITE_MAX_CASES}).", "cases": []}
+    code = preprocess_code(code, clean)
     temp_dir = tempfile.mkdtemp()
-    source_path = os.path.join(temp_dir, f"{main_class}.kt")
-    output_jar = os.path.join(temp_dir, f"{main_class}.jar")
+    started = time.perf_counter()
     try:
-        with open(source_path, 'w') as f:
-            f.write(code)
-        compile_command = ['kotlinc', source_path, '-include-runtime', '-d', output_jar]
-        compile_result = subprocess.run(compile_command, cwd=temp_dir, capture_output=True, text=True, timeout=15)
-        if compile_result.returncode != 0:
-            return f"❌ Compilation Error:\n{compile_result.stderr}"
-        run_command = ['java', '-jar', output_jar]
-        run_result = subprocess.run(run_command, cwd=temp_dir, capture_output=True, text=True, timeout=10)
-        if run_result.returncode != 0:
-            return f"❌ Runtime Error:\n{run_result.stderr}"
-        return run_result.stdout or "✅ Ran successfully, no output."
-    except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
-    except Exception as e:
-        return f"❌ Execution error: {str(e)}"
+        try:
+            program = entry.builder(code, temp_dir, java_main_class or "Main")
+        except CompilationError as e:
+            return {"error": f"❌ Compilation Error:\n{e}", "cases": []}
+        except FileNotFoundError as e:
+            return {"error": MISSING_TOOL_MESSAGES.get(e.filename, f"❌ Execution error: {str(e)}"), "cases": []}
+        build_ms = round((time.perf_counter() - started) * 1000, 1)
+        report_stage("running")
+        futures = [test_case_pool.submit(run_test_case, program, index, case) for index, case in enumerate(cases)]
+        results = [future.result() for future in futures]
     finally:
+        _finish_stage()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return {
+        "cases": results,
+        "passed": sum(1 for case in results if case["status"] == "pass"),
+        "failed": sum(1 for case in results if case["status"] in ("fail", "error", "timeout")),
+        "total": len(results),
+        "build_ms": build_ms,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+LIVE_RUN_LIMIT = int(os.getenv("LIVE_RUN_LIMIT", 8))
+LIVE_RUN_TIMEOUT = int(os.getenv("LIVE_RUN_TIMEOUT", 300))
+LIVE_RUN_HEARTBEAT = int(os.getenv("LIVE_RUN_HEARTBEAT", 15))
+LIVE_RUN_RETRY_AFTER = int(os.getenv("LIVE_RUN_RETRY_AFTER", 5))
+LIVE_RUN_MESSAGES = {
+    "cancelled": "❌ Run cancelled.",
+    "timeout": "❌ Execution timed out.",
+    "output_limit": truncation_marker(),
+}
+live_run_outcomes = Counter("ai_debugger_live_run_outcomes_total", "Live runs by how they ended.", ("language", "outcome"))
+METRICS.append(live_run_outcomes)
+
+class LiveRun:
+    def __init__(self, language):
+        self.id = uuid.uuid4().hex
+        self.language = language
+        self.temp_dir = tempfile.mkdtemp()
+        self.events = queue.Queue()
+        self.process = None
+        self.cancelled = False
+        self._stdin = queue.Queue()
+        self._lock = threading.Lock()
+
+    def start(self, program):
+        with self._lock:
+            if self.cancelled:
+                return False
+            self.process = program.spawn()
+        threading.Thread(target=self._pump, daemon=True, name=f"live-run-{self.id[:8]}").start()
+        threading.Thread(target=self._feed, daemon=True, name=f"live-stdin-{self.id[:8]}").start()
+        return True
+
+    def send_input(self, text):
+        # Input typed while the program is still compiling is queued; _feed delivers it once the process starts.
+        if self.cancelled or (self.process is not None and self.process.poll() is not None):
+            return False
+        self._stdin.put(text.encode("utf-8"))
+        return True
+
+    def close_input(self):
+        self._stdin.put(None)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            process = self.process
+        if process is not None and process.poll() is None:
+            _kill_process_group(process)
+        self._stdin.put(None)
+
+    def _feed(self):
+        # Writes happen here so a program that stops reading never blocks the request that sent the input.
+        stdin = self.process.stdin
         try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Error during Kotlin cleanup: {e}")
+            while True:
+                data = self._stdin.get()
+                if data is None:
+                    break
+                stdin.write(data)
+                stdin.flush()
+        except (BrokenPipeError, ValueError, OSError):
+            pass
+        finally:
+            try:
+                stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
 
-def execute_arduino_code(code):
-    temp_dir = tempfile.mkdtemp()
-    sketch_dir = os.path.join(temp_dir, "sketch")
-    os.makedirs(sketch_dir)
-    sketch_file = os.path.join(sketch_dir, "sketch.ino")
-    try:
-        with open(sketch_file, 'w') as f:
-            f.write(code)
-        compile_command = ['arduino-cli', 'compile', '--fqbn', 'arduino:avr:uno', sketch_dir]
-        compile = subprocess.run(compile_command, capture_output=True, text=True, timeout=30)
-        if compile.returncode != 0:
-            return f"❌ Compilation Error (Arduino CLI):\n{compile.stderr}"
-        return "✅ Arduino code compiled successfully."
-    except subprocess.TimeoutExpired:
-        return "❌ Arduino compilation timed out."
-    except Exception as e:
-        return f"❌ Error during Arduino compilation: {str(e)}"
-    finally:
+    def _pump(self):
+        process = self.process
+        started = time.monotonic()
+        deadline = started + LIVE_RUN_TIMEOUT
+        streams = {
+            process.stdout.fileno(): ("stdout", codecs.getincrementaldecoder("utf-8")("replace")),
+            process.stderr.fileno(): ("stderr", codecs.getincrementaldecoder("utf-8")("replace")),
+        }
+        size = 0
+        reason = None
         try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Error during Arduino cleanup: {e}")
+            with selectors.DefaultSelector() as selector:
+                for stream in (process.stdout, process.stderr):
+                    selector.register(stream, selectors.EVENT_READ)
+                while selector.get_map() and reason is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        reason = "timeout"
+                        break
+                    for key, _ in selector.select(remaining):
+                        chunk = os.read(key.fd, 65536)
+                        if not chunk:
+                            selector.unregister(key.fileobj)
+                            continue
+                        name, decoder = streams[key.fd]
+                        text = decoder.decode(chunk[:max(EXEC_OUTPUT_LIMIT - size, 0)])
+                        size += len(chunk)
+                        if text:
+                            self.events.put((name, text))
+                        if size >= EXEC_OUTPUT_LIMIT:
+                            reason = "output_limit"
+                            break
+            if reason is not None:
+                _kill_process_group(process)
+            returncode = process.wait()
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+        if self.cancelled:
+            reason = "cancelled"
+        outcome = reason or ("ok" if returncode == 0 else "error")
+        live_run_outcomes.inc(language=metric_language(self.language), outcome=outcome)
+        self.events.put(("exit", {
+            "returncode": returncode,
+            "reason": reason,
+            "message": LIVE_RUN_MESSAGES.get(reason, ""),
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }))
 
-def execute_verilog_code(code, language):
-    temp_dir = tempfile.mkdtemp()
-    file_extension = ".v" if language in ["verilog"] else ".sv"
-    file_path = os.path.join(temp_dir, f"design{file_extension}")
-    output_vvp = os.path.join(temp_dir, "a.out")
+    def cleanup(self):
+        self.cancel()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+class LiveRunRegistry:
+    def __init__(self, limit):
+        self.limit = limit
+        self.rejected = 0
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def create(self, language):
+        with self._lock:
+            if len(self._runs) >= self.limit:
+                self.rejected += 1
+                return None
+            run = LiveRun(language)
+            self._runs[run.id] = run
+        return run
+
+    def get(self, run_id):
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def remove(self, run):
+        with self._lock:
+            self._runs.pop(run.id, None)
+        run.cleanup()
+
+live_runs = LiveRunRegistry(LIVE_RUN_LIMIT)
+
+def stream_live_run(run, code, java_main_class):
+    entry = LANGUAGES[run.language]
     try:
-        with open(file_path, 'w') as f:
-            f.write(code)
-        compile_command = ['iverilog', '-o', output_vvp, file_path]
-        compile_result = subprocess.run(compile_command, cwd=temp_dir, capture_output=True, text=True, timeout=15)
-        if compile_result.returncode != 0:
-            return f"❌ Compilation Error:\n{compile_result.stderr}"
-        if "initial begin" in code or "always_ff" in code or "always_comb" in code or "program " in code:
-            run_command = ['vvp', output_vvp]
-            run_result = subprocess.run(run_command, cwd=temp_dir, capture_output=True, text=True, timeout=15)
-            if run_result.returncode != 0:
-                return f"❌ Runtime Error (Simulation):\n{run_result.stderr}"
-            return run_result.stdout or "✅ Verilog/SystemVerilog/UVM compiled and ran successfully (no output to display)."
-        else:
-            return "✅ Verilog/SystemVerilog/UVM compiled successfully (no testbench found for simulation)."
-    except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
-    except Exception as e:
-        return f"❌ Error: {str(e)}"
-    finally:
+        yield sse_event("session", {"id": run.id})
+        yield sse_event("stage", "compiling")
         try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Error during Verilog cleanup: {e}")
+            program = entry.builder(preprocess_code(code), run.temp_dir, java_main_class or "Main")
+        except CompilationError as e:
+            yield sse_event("error", f"❌ Compilation Error:\n{e}")
+            return
+        except FileNotFoundError as e:
+            yield sse_event("error", MISSING_TOOL_MESSAGES.get(e.filename, f"❌ Execution error: {str(e)}"))
+            return
+        if not run.start(program):
+            yield sse_event("exit", {"returncode": None, "reason": "cancelled",
+                                     "message": LIVE_RUN_MESSAGES["cancelled"], "elapsed_ms": 0})
+            return
+        yield sse_event("stage", "running")
+        while True:
+            try:
+                event, data = run.events.get(timeout=LIVE_RUN_HEARTBEAT)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse_event(event, data)
+            if event == "exit":
+                break
+    finally:
+        # Also reached when the client disconnects, which kills the program instead of letting it run to the timeout.
+        live_runs.remove(run)
 
-def execute_javascript_code(code):
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".js", mode='w')
-    temp_file.write(code)
-    temp_file.close()
+SPEED_TEMPLATE = PromptTemplate("""Make this {language} code faster without changing what it prints.
+{code}
+Profile of one run:
+{profile}
+Requirements:
+1. Work from the measurements above: focus on the hotspots and leave code the profile shows is cheap alone.
+2. Keep the program's input and output behaviour identical.
+3. In the explanation, say which hotspot each change addresses.
+4. Ensure the code is runnable.""")
+
+def format_profile(report):
+    lines = [f"Tool: {report['tool']}", f"Wall time: {report['wall_ms']} ms"]
+    if report.get("cpu_ms") is not None:
+        lines.append(f"CPU time: {report['cpu_ms']} ms")
+    if report.get("peak_memory_kb") is not None:
+        lines.append(f"Peak memory: {report['peak_memory_kb']} KB")
+    if report.get("python_heap_peak_kb") is not None:
+        lines.append(f"Peak Python heap: {report['python_heap_peak_kb']} KB")
+    for name, value in report.get("counters", {}).items():
+        lines.append(f"{name}: {value:g}")
+    if report.get("hotspots"):
+        lines.append("Hotspots by self time:")
+        for hotspot in report["hotspots"]:
+            details = [f"{hotspot['self_ms']} ms self"]
+            if hotspot.get("total_ms") is not None:
+                details.append(f"{hotspot['total_ms']} ms total")
+            if hotspot.get("calls") is not None:
+                details.append(f"{hotspot['calls']} calls")
+            lines.append(f"- {hotspot['name']}: {', '.join(details)}")
+    else:
+        lines.append("No per-function hotspots were collected.")
+    return "\n".join(lines)
+
+def profile_code(code, language, test_inputs=None, java_main_class=None, clean=False):
+    entry = LANGUAGES.get(language)
+    if entry is None or entry.profiler is None:
+        return {"error": f"❌ Profiling is not supported for {language}."}
+    code = preprocess_code(code, clean)
+    stdin_text = "".join(f"{line}\n" for line in test_inputs) if test_inputs else None
+    temp_dir = tempfile.mkdtemp()
+    _stage_local.language = language
     try:
-        run_command = ['node', temp_file.name]
-        run_result = subprocess.run(run_command, capture_output=True, text=True, timeout=10)
-        if run_result.returncode != 0:
-            return f"❌ Runtime Error:\n{run_result.stderr}"
-        return run_result.stdout or "✅ Ran successfully, no output."
-    except FileNotFoundError:
-        return "❌ Error: Node.js is not installed or not in your system's PATH. Please install it to execute JavaScript code."
+        with timed("profile", language):
+            return entry.profiler(code, temp_dir, java_main_class or "Main", stdin_text)
+    except CompilationError as e:
+        return {"error": f"❌ Compilation Error:\n{e}"}
+    except FileNotFoundError as e:
+        return {"error": MISSING_TOOL_MESSAGES.get(e.filename, f"❌ Execution error: {str(e)}")}
     except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
+        return {"error": "❌ Execution timed out."}
     except Exception as e:
-        return f"❌ Execution error: {str(e)}"
+        return {"error": f"❌ Profiling failed: {str(e)}"}
     finally:
-        os.remove(temp_file.name)
+        _finish_stage()
+        _stage_local.language = None
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def optimize_code_with_gemini(code, language, report):
+    payload = "\0".join([SPEED_TEMPLATE.version, "speed", language, normalize_code_for_cache(code)])
+    cache_key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    cached = fix_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    def request_optimization():
+        prompt = SPEED_TEMPLATE.render(code=code, language=language, profile=format_profile(report))
+        response = _gemini_api_call_with_retries(model_registry.get("fix").generate_content, prompt)
+        fixed_code_result, explanation_text = split_fix_response(response.text)
+        fixed_code_result = preprocess_code(fixed_code_result)
+        fix_cache.put(cache_key, fixed_code_result, explanation_text)
+        return fixed_code_result, explanation_text
 
-def execute_typescript_code(code):
-    temp_ts_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ts", mode='w')
-    temp_ts_file.write(code)
-    temp_ts_file.close()
-    
-    temp_js_file_path = temp_ts_file.name.replace(".ts", ".js")
-    
     try:
-        compile_command = ['tsc', '--outFile', temp_js_file_path, temp_ts_file.name]
-        compile_result = subprocess.run(compile_command, capture_output=True, text=True, timeout=15)
-        
-        if compile_result.returncode != 0:
-            return f"❌ Compilation Error:\n{compile_result.stderr}"
-        
-        run_command = ['node', temp_js_file_path]
-        run_result = subprocess.run(run_command, capture_output=True, text=True, timeout=10)
-        
-        if run_result.returncode != 0:
-            return f"❌ Runtime Error:\n{run_result.stderr}"
-            
-        return run_result.stdout or "✅ Ran successfully, no output."
-        
-    except FileNotFoundError as e:
-        if 'tsc' in str(e):
-            return "❌ Error: TypeScript compiler ('tsc') is not installed. Please install it globally via `npm install -g typescript`."
-        elif 'node' in str(e):
-            return "❌ Error: Node.js is not installed. Please install it to execute TypeScript code."
-        else:
-            return f"❌ Execution Error: {str(e)}"
-    except subprocess.TimeoutExpired:
-        return "❌ Execution timed out."
+        return fix_flight.do(cache_key, request_optimization)
     except Exception as e:
-        return f"❌ Execution error: {str(e)}"
-    finally:
-        os.remove(temp_ts_file.name)
-        if os.path.exists(temp_js_file_path):
-            os.remove(temp_js_file_path)
+        return f"❌ Error contacting AI: {str(e)}", "Could not generate explanation due to an error or repeated API failures."
 
-def execute_sql_code(code):
-    output = []
-    queries = [q.strip() for q in code.split(';') if q.strip()]
-    if not queries:
-        return "✅ Ran successfully, no output."
-    conn = None
+BENCHMARK_RUNS = int(os.getenv("BENCHMARK_RUNS", 5))
+BENCHMARK_WARMUP = int(os.getenv("BENCHMARK_WARMUP", 1))
+BENCHMARK_MAX_RUNS = int(os.getenv("BENCHMARK_MAX_RUNS", 50))
+BENCHMARK_MAX_WARMUP = int(os.getenv("BENCHMARK_MAX_WARMUP", 5))
+BENCHMARK_TIMEOUT = int(os.getenv("BENCHMARK_TIMEOUT", 10))
+BENCHMARK_BUDGET = int(os.getenv("BENCHMARK_BUDGET", 60))
+BENCHMARK_REGRESSION_THRESHOLD = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", 0.05))
+
+def summarize_runs(runs):
+    times = [run.wall_time * 1000 for run in runs]
+    cpu_times = [(run.rusage.ru_utime + run.rusage.ru_stime) * 1000 for run in runs if run.rusage is not None]
+    peaks = [run.peak_rss_kb for run in runs if run.peak_rss_kb]
+    return {
+        "runs": len(times),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "stddev_ms": round(statistics.stdev(times), 3) if len(times) > 1 else 0.0,
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+        "cpu_mean_ms": round(statistics.fmean(cpu_times), 3) if cpu_times else None,
+        "peak_memory_kb": max(peaks, default=None),
+    }
+
+def compare_benchmarks(original, fixed, threshold=BENCHMARK_REGRESSION_THRESHOLD):
+    delta = fixed["mean_ms"] - original["mean_ms"]
+    # Two standard errors of the difference in means; smaller gaps are indistinguishable from run-to-run jitter.
+    noise = 2 * (original["stddev_ms"] ** 2 / original["runs"] + fixed["stddev_ms"] ** 2 / fixed["runs"]) ** 0.5
+    relative = delta / original["mean_ms"] if original["mean_ms"] else 0.0
+    if delta > noise and relative > threshold:
+        verdict = "regression"
+    elif -delta > noise and -relative > threshold:
+        verdict = "faster"
+    else:
+        verdict = "no significant change"
+    memory_delta = None
+    if original["peak_memory_kb"] is not None and fixed["peak_memory_kb"] is not None:
+        memory_delta = fixed["peak_memory_kb"] - original["peak_memory_kb"]
+    return {"delta_ms": round(delta, 3), "relative_change": round(relative, 4), "noise_ms": round(noise, 3),
+            "memory_delta_kb": memory_delta, "verdict": verdict, "regression": verdict == "regression"}
+
+def run_benchmark(original_code, fixed_code, language, test_inputs=None, java_main_class=None,
+                  runs=BENCHMARK_RUNS, warmup=BENCHMARK_WARMUP):
+    entry = LANGUAGES.get(language)
+    if entry is None or entry.builder is None:
+        return {"error": f"❌ Benchmarks are not supported for {language}."}
+    # Benchmarks run on the job workers so they count against the same per-language limits as queued fixes.
+    result = job_queue.run_now(language, _run_benchmark, entry, original_code, fixed_code, test_inputs,
+                               java_main_class, runs, warmup)
+    if result is None:
+        return {"error": f"❌ Too many {language} jobs are running. Please retry the benchmark later."}
+    return result
+
+def _run_benchmark(entry, original_code, fixed_code, test_inputs, java_main_class, runs, warmup):
+    runs = max(1, min(runs, BENCHMARK_MAX_RUNS))
+    warmup = max(0, min(warmup, BENCHMARK_MAX_WARMUP))
+    deadline = time.monotonic() + BENCHMARK_BUDGET
+    stdin_text = "".join(f"{line}\n" for line in test_inputs) if test_inputs else None
+    programs = {}
+    temp_dirs = []
+    samples = {"original": [], "fixed": []}
+    outputs = {}
     try:
-        conn = sqlite3.connect(':memory:')
-        cursor = conn.cursor()
-        for query in queries:
-            if not query.strip():
-                continue
-            output.append(f"Executing query: {query}")
+        for label, code, clean in (("original", original_code, False), ("fixed", fixed_code, True)):
+            temp_dirs.append(tempfile.mkdtemp())
             try:
-                cursor.execute(query)
-                conn.commit()
-                if query.lower().startswith('select'):
-                    rows = cursor.fetchall()
-                    if rows:
-                        headers = [desc[0] for desc in cursor.description]
-                        output.append("--- Results ---")
-                        output.append(" | ".join(headers))
-                        output.append("-" * len(" | ".join(headers)))
-                        for row in rows:
-                            output.append(" | ".join(map(str, row)))
-                        output.append("---------------")
-                    else:
-                        output.append("✅ Query executed successfully, no rows returned.")
-                else:
-                    output.append("✅ Statement executed successfully.")
-            except sqlite3.Error as e:
-                output.append(f"❌ SQL Error: {e}")
+                programs[label] = entry.builder(preprocess_code(code, clean), temp_dirs[-1], java_main_class or "Main")
+            except CompilationError as e:
+                return {"error": f"❌ The {label} code did not compile:\n{e}"}
+            except FileNotFoundError as e:
+                return {"error": MISSING_TOOL_MESSAGES.get(e.filename, f"❌ Execution error: {str(e)}")}
+        report_stage("running")
+        # Alternate the two programs so drift in machine load affects both sides equally.
+        for iteration in range(warmup + runs):
+            pair = {}
+            for label, program in programs.items():
+                timeout = min(BENCHMARK_TIMEOUT, deadline - time.monotonic())
+                try:
+                    run = program.measure(stdin_text, max(timeout, 0.1))
+                except subprocess.TimeoutExpired:
+                    if timeout >= BENCHMARK_TIMEOUT:
+                        raise
+                    # The budget ran out mid-pair; keep only the pairs that finished.
+                    pair = None
+                    break
+                if run.returncode != 0:
+                    return {"error": f"❌ The {label} code failed while benchmarking:\n{run.stderr}"}
+                outputs[label] = run.stdout
+                pair[label] = run
+            if pair is None:
                 break
-    except Exception as e:
-        return f"❌ An unexpected error occurred: {str(e)}"
+            if iteration >= warmup:
+                for label, run in pair.items():
+                    samples[label].append(run)
+            if time.monotonic() >= deadline:
+                break
+    except subprocess.TimeoutExpired:
+        return {"error": f"❌ A benchmark run took longer than {BENCHMARK_TIMEOUT} seconds."}
     finally:
-        if conn:
-            conn.close()
-    return "\n".join(output)
+        _finish_stage()
+        for temp_dir in temp_dirs:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    if not samples["original"]:
+        return {"error": f"❌ The benchmark did not finish within its {BENCHMARK_BUDGET} second budget."}
+    original, fixed = summarize_runs(samples["original"]), summarize_runs(samples["fixed"])
+    return {
+        "original": original,
+        "fixed": fixed,
+        "warmup": warmup,
+        "budget_exhausted": original["runs"] < runs,
+        "comparison": compare_benchmarks(original, fixed),
+        "outputs_match": normalize_output(outputs["original"]) == normalize_output(outputs["fixed"]),
+    }
+
+CONCURRENT_PIPELINE = os.getenv("CONCURRENT_PIPELINE", "1") == "1"
+BASELINE_TIMEOUT = int(os.getenv("BASELINE_TIMEOUT", 40))
+BASELINE_LANGUAGES = {name for name, language in LANGUAGES.items() if language.runnable}
+execution_pool = ThreadPoolExecutor(max_workers=int(os.getenv("EXECUTION_POOL_WORKERS", 8)),
+                                    thread_name_prefix="execute")
+
+def start_baseline_execution(code, language, test_inputs=None, java_main_class=None):
+    if not CONCURRENT_PIPELINE or language not in BASELINE_LANGUAGES or not code.strip():
+        return None
+    return execution_pool.submit(validate_and_execute_code, code, language, test_inputs, java_main_class)
 
-def validate_and_execute_code(code, language, test_inputs=None, java_main_class=None):
+def collect_baseline_output(future):
+    if future is None:
+        return ""
     try:
-        code = preprocess_code(code)
-        if language == "python":
-            return execute_python_code(code, test_inputs)
-        elif language == "java":
-            return execute_java_code(code, java_main_class)
-        elif language == "cpp":
-            return execute_cpp_code(code)
-        elif language == "go":
-            return execute_go_code(code)
-        elif language == "rust":
-            return execute_rust_code(code)
-        elif language == "ruby":
-            return execute_ruby_code(code)
-        elif language == "kotlin":
-            class_match = re.search(r'fun\s+main', code)
-            main_class = "MainKt" if class_match else "Main"
-            return execute_kotlin_code(code, main_class)
-        elif language == "arduino":
-            return execute_arduino_code(code)
-        elif language in ["verilog", "systemverilog", "uvm"]:
-            return execute_verilog_code(code, language)
-        elif language == "javascript":
-            return execute_javascript_code(code)
-        elif language == "typescript":
-            return execute_typescript_code(code)
-        elif language == "sql":
-            return execute_sql_code(code)
-        elif language in ["html", "css", "django", "react"]:
-            if language in ["django", "react"]:
-                return f"✅ Code fixed successfully. Note: {language.capitalize()} requires a full project setup to run. The AI has provided the corrected snippet."
-            else:
-                return f"✅ Code fixed successfully. To see this {language.upper()} code in action, you need to open it in a web browser. The execution panel shows the raw, corrected code."
+        return future.result(timeout=BASELINE_TIMEOUT)
+    except FutureTimeoutError:
+        return "❌ Original code execution timed out."
     except Exception as e:
-        return f"❌ Execution failed: {str(e)}"
+        return f"❌ Original code execution failed: {str(e)}"
+
+SUPPORTED_LANGUAGES = set(LANGUAGES)
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", 64))
+JOB_LANGUAGE_QUEUE_LIMIT = int(os.getenv("JOB_LANGUAGE_QUEUE_LIMIT", 16))
+JOB_TTL = int(os.getenv("JOB_TTL", 3600))
+JOB_RETRY_AFTER = int(os.getenv("JOB_RETRY_AFTER", 5))
+JOB_DEFAULT_CONCURRENCY = int(os.getenv("JOB_DEFAULT_CONCURRENCY", 4))
+JOB_LANGUAGE_CONCURRENCY = {"java": 2, "kotlin": 1, "cpp": 2, "rust": 2, "go": 2, "typescript": 2, "arduino": 1}
+for _entry in os.getenv("JOB_LANGUAGE_CONCURRENCY", "").split(","):
+    if "=" in _entry:
+        _language, _limit = _entry.split("=", 1)
+        JOB_LANGUAGE_CONCURRENCY[_language.strip()] = int(_limit)
+
+class Job:
+    def __init__(self, language, code, test_inputs, java_main_class):
+        self.id = uuid.uuid4().hex
+        self.language = language
+        self.code = code
+        self.test_inputs = test_inputs
+        self.java_main_class = java_main_class
+        self.status = "queued"
+        self.stages = []
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        self.set_stage("queued")
+
+    def set_stage(self, stage):
+        self.status = stage
+        self.stages.append({"stage": stage, "at": time.time()})
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "language": self.language,
+            "status": self.status,
+            "stages": list(self.stages),
+            "result": self.result,
+            "error": self.error,
+        }
+
+class JobQueue:
+    def __init__(self, limit, language_limit, default_concurrency, language_concurrency, ttl):
+        self.limit = limit
+        self.language_limit = language_limit
+        self.default_concurrency = default_concurrency
+        self.language_concurrency = language_concurrency
+        self.ttl = ttl
+        self.rejected = 0
+        self._jobs = {}
+        self._pools = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, language):
+        pool = self._pools.get(language)
+        if pool is None:
+            workers = self.language_concurrency.get(language, self.default_concurrency)
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"job-{language}")
+            self._pools[language] = pool
+        return pool
+
+    def _admit(self, language):
+        # Each language may always fill its own workers, so a backlog in one language cannot lock the others out.
+        active = self._active.get(language, 0)
+        workers = self.language_concurrency.get(language, self.default_concurrency)
+        if active >= self.language_limit or (sum(self._active.values()) >= self.limit and active >= workers):
+            self.rejected += 1
+            return False
+        self._active[language] = active + 1
+        return True
+
+    def submit(self, language, code, test_inputs, java_main_class):
+        with self._lock:
+            self._purge()
+            if not self._admit(language):
+                return None
+            job = Job(language, code, test_inputs, java_main_class)
+            self._jobs[job.id] = job
+            self._pool(language).submit(self._run, job)
+        return job
+
+    def run_now(self, language, func, *args):
+        with self._lock:
+            if not self._admit(language):
+                return None
+            future = self._pool(language).submit(func, *args)
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self._active[language] -= 1
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self, language=None):
+        with self._lock:
+            return self._active.get(language, 0) if language else sum(self._active.values())
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        try:
+            job.set_stage("fixing")
+            fixed_code, explanation = fix_code_with_gemini(job.code, job.language)
+            result_id = result_store.save({"language": job.language, "fixed_code": fixed_code, "explanation": explanation})
+            _stage_local.callback = job.set_stage
+            output = validate_and_execute_code(fixed_code, job.language, job.test_inputs, job.java_main_class, clean=True)
+            job.result = {"id": result_id, "fixed_code": fixed_code, "explanation": explanation,
+                          "diff": fix_diff(job.code, fixed_code), "output": output}
+            job.set_stage("done")
+        except Exception as e:
+            job.error = str(e)
+            job.set_stage("failed")
+        finally:
+            _stage_local.callback = None
+            job.finished_at = time.time()
+            with self._lock:
+                self._active[job.language] -= 1
+
+job_queue = JobQueue(JOB_QUEUE_LIMIT, JOB_LANGUAGE_QUEUE_LIMIT, JOB_DEFAULT_CONCURRENCY, JOB_LANGUAGE_CONCURRENCY,
+                     JOB_TTL)
+
+def read_test_inputs(form, code, input_prompts):
+    test_inputs = []
+    if requires_test_input(code):
+        for i in range(len(input_prompts)):
+            test_inputs.append(form.get(f"test_input_{i}", ""))
+    return test_inputs
+
+class ExplanationSplitter:
+    def __init__(self, marker=EXPLANATION_MARKER):
+        self.marker = marker
+        self.section = "code"
+        self._pending = ""
+
+    def feed(self, text):
+        events = []
+        self._pending += text
+        if self.section == "code":
+            index = self._pending.find(self.marker)
+            if index != -1:
+                if index:
+                    events.append(("code", self._pending[:index]))
+                self._pending = self._pending[index + len(self.marker):]
+                self.section = "explanation"
+            else:
+                # Hold back a possible partial marker at the end of the buffer.
+                safe = len(self._pending) - len(self.marker) + 1
+                if safe > 0:
+                    events.append(("code", self._pending[:safe]))
+                    self._pending = self._pending[safe:]
+                return events
+        if self._pending:
+            events.append(("explanation", self._pending))
+            self._pending = ""
+        return events
+
+    def flush(self):
+        events = [(self.section, self._pending)] if self._pending else []
+        self._pending = ""
+        return events
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_fix_events(code, language, test_inputs, java_main_class, test_cases=None, benchmark=False):
+    baseline = start_baseline_execution(code, language, test_inputs, java_main_class)
+    cache_key = fix_cache_key(code, language)
+    cached = fix_cache.get(cache_key)
+    call, leader = (None, False) if cached is not None else fix_flight.begin(cache_key)
+    if cached is not None or not leader:
+        try:
+            result, explanation = cached if cached is not None else fix_flight.follow(
+                call, lambda: request_fix(code, language, cache_key))
+            yield sse_event("code", result)
+            yield sse_event("explanation", explanation)
+        except Exception as e:
+            result = f"❌ Error contacting AI: {str(e)}"
+            explanation = "Could not generate explanation due to an error or repeated API failures."
+            yield sse_event("error", result)
+    elif uses_structured_fix(code):
+        # Diff and chunked replies are not readable as they arrive, so large files wait for the applied result.
+        try:
+            result, explanation = request_fix(code, language, cache_key)
+            fix_flight.finish(cache_key, call, result=(result, explanation))
+        except Exception as e:
+            fix_flight.finish(cache_key, call, error=e)
+            result = f"❌ Error contacting AI: {str(e)}"
+            explanation = "Could not generate explanation due to an error or repeated API failures."
+            yield sse_event("error", result)
+        else:
+            yield sse_event("code", result)
+            yield sse_event("explanation", explanation)
+    else:
+        full = []
+        splitter = ExplanationSplitter()
+        error = Exception("The original request was cancelled.")
+        try:
+            prompt = build_fix_prompt(code, language)
+            chunks = _gemini_api_call_with_retries(model_registry.get("fix").generate_content, prompt, stream=True)
+            for chunk in chunks:
+                text = chunk.text
+                full.append(text)
+                for section, part in splitter.feed(text):
+                    yield sse_event(section, part)
+            for section, part in splitter.flush():
+                yield sse_event(section, part)
+            result, explanation = split_fix_response("".join(full))
+            result = preprocess_code(result)
+            fix_cache.put(cache_key, result, explanation)
+            error = None
+        except Exception as e:
+            error = e
+            result = f"❌ Error contacting AI: {str(e)}"
+            explanation = "Could not generate explanation due to an error or repeated API failures."
+            yield sse_event("error", result)
+        finally:
+            if error is None:
+                fix_flight.finish(cache_key, call, result=(result, explanation))
+            else:
+                fix_flight.finish(cache_key, call, error=error)
+    result_id = result_store.save({"language": language, "fixed_code": result, "explanation": explanation})
+    yield sse_event("result", {"id": result_id, "fixed_code": result, "explanation": explanation,
+                               "diff": fix_diff(code, result)})
+    yield sse_event("output", validate_and_execute_code(result, language, test_inputs, java_main_class, clean=True))
+    if test_cases:
+        yield sse_event("test_suite", run_test_suite(result, language, test_cases, java_main_class, clean=True))
+    if benchmark and not result.startswith("❌"):
+        yield sse_event("benchmark", run_benchmark(code, result, language, test_inputs, java_main_class))
+    original_output = collect_baseline_output(baseline)
+    if original_output:
+        yield sse_event("original_output", original_output)
+    yield sse_event("done", {"id": result_id})
+
+@app.route("/stream_fix", methods=["POST"])
+def stream_fix():
+    language = request.form.get("language", "python")
+    code = request.form.get("code", "")
+    java_main_class = request.form.get("java_main_class", "Main")
+    test_inputs = []
+    if language == "python":
+        test_inputs = read_test_inputs(request.form, code, get_input_prompts(code))
+    test_cases = parse_test_cases(request.form.get("test_cases", ""))
+    benchmark = request.form.get("benchmark") == "1"
+    response = Response(stream_with_context(stream_fix_events(code, language, test_inputs, java_main_class, test_cases,
+                                                              benchmark)),
+                        mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.before_request
+def start_request_timing():
+    g.request_started = time.perf_counter()
+    _timings_local.timings = []
+
+@app.after_request
+def add_server_timing(response):
+    timings = getattr(_timings_local, "timings", None) or []
+    _timings_local.timings = None
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    started = g.get("request_started")
+    if started is not None:
+        request_duration.observe(time.perf_counter() - started, endpoint=request.endpoint or "unknown")
+    return response
+
+@app.route("/metrics")
+def metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    global fixed_code_result, explanation_text
     code = ""
     result = ""
     explanation = ""
+    diff = ""
     output = ""
+    original_output = ""
+    result_id = ""
     test_inputs = []
     input_prompts = []
+    test_cases = ""
+    test_suite = None
+    benchmark = None
+    benchmark_requested = False
     java_main_class = "Main"
     language = "python"
     if request.method == "POST":
@@ -1727,65 +5238,231 @@ def index():
         java_main_class = request.form.get("java_main_class", "Main")
         if language == "python":
             input_prompts = get_input_prompts(code)
-            if requires_test_input(code):
-                for i in range(len(input_prompts)):
-                    input_value = request.form.get(f"test_input_{i}", "")
-                    test_inputs.append(input_value)
-        fix_code_with_gemini(code, language)
-        result = fixed_code_result
-        explanation = explanation_text
-        output = validate_and_execute_code(result, language, test_inputs, java_main_class)
-    return render_template_string(
-        HTML_TEMPLATE,
-        code=code,
-        result=result,
-        explanation=explanation,
-        output=output,
-        language=language,
-        input_prompts=input_prompts,
-        test_inputs=test_inputs,
-        java_main_class=java_main_class,
-    )
+            test_inputs = read_test_inputs(request.form, code, input_prompts)
+        baseline = start_baseline_execution(code, language, test_inputs, java_main_class)
+        with timed("gemini", language):
+            result, explanation = fix_code_with_gemini(code, language)
+        diff = fix_diff(code, result)
+        result_id = result_store.save({"language": language, "fixed_code": result, "explanation": explanation})
+        output = validate_and_execute_code(result, language, test_inputs, java_main_class, clean=True)
+        test_cases = request.form.get("test_cases", "")
+        if test_cases.strip():
+            with timed("test_suite", language):
+                test_suite = run_test_suite(result, language, parse_test_cases(test_cases), java_main_class, clean=True)
+        benchmark_requested = request.form.get("benchmark") == "1"
+        if benchmark_requested and not result.startswith("❌"):
+            with timed("benchmark", language):
+                benchmark = run_benchmark(code, result, language, test_inputs, java_main_class)
+        with timed("baseline_wait", language):
+            original_output = collect_baseline_output(baseline)
+    with timed("render", language):
+        return render_template_string(
+            HTML_TEMPLATE,
+            code=code,
+            result=result,
+            explanation=explanation,
+            diff=diff,
+            output=output,
+            original_output=original_output,
+            result_id=result_id,
+            language=language,
+            input_prompts=input_prompts,
+            test_inputs=test_inputs,
+            java_main_class=java_main_class,
+            test_cases=test_cases,
+            test_suite=test_suite,
+            benchmark=benchmark,
+            benchmark_requested=benchmark_requested,
+            language_modes=LANGUAGE_MODES,
+        )
 
 @app.route("/download")
 def download():
-    global fixed_code_result
-    ext = ".txt"
-    if "void setup()" in fixed_code_result or "void loop()" in fixed_code_result:
-        ext = ".ino"
-    elif "public class" in fixed_code_result:
-        ext = ".java"
-    elif "func main()" in fixed_code_result:
-        ext = ".go"
-    elif "fn main()" in fixed_code_result:
-        ext = ".rs"
-    elif re.search(r'module\s+', fixed_code_result, re.IGNORECASE) or re.search(r'class\s+extends\s+uvm', fixed_code_result, re.IGNORECASE):
-        if "logic" in fixed_code_result or "interface" in fixed_code_result or "class " in fixed_code_result:
-            ext = ".sv"
-        else:
-            ext = ".v"
-    elif fixed_code_result.strip().startswith('<!DOCTYPE html>'):
-        ext = ".html"
-    elif re.search(r'selector\s*\{', fixed_code_result):
-        ext = ".css"
-    elif "import React" in fixed_code_result:
-        ext = ".jsx"
-    elif "from django.db import models" in fixed_code_result:
-        ext = ".py"
-    elif fixed_code_result.strip().startswith('import React') or "function" in fixed_code_result or "const" in fixed_code_result:
-        ext = ".js"
-    elif "let" in fixed_code_result or "const" in fixed_code_result or "function" in fixed_code_result:
-        ext = ".ts"
-    elif re.search(r'(SELECT|INSERT|UPDATE|DELETE|CREATE|DROP)\s+', fixed_code_result, re.IGNORECASE):
-        ext = ".sql"
-    else:
-        ext = ".py"
+    stored = result_store.get(request.args.get("id", ""))
+    if stored is None:
+        return make_response("No debugged code found for this id. Please run the debugger again.", 404)
+    fixed_code_result = stored["fixed_code"]
+    language = LANGUAGES.get(stored["language"])
+    ext = language.extension if language else ".txt"
 
     response = make_response(fixed_code_result)
     response.headers["Content-Disposition"] = f"attachment; filename=debugged_code{ext}"
     response.mimetype = "text/plain"
     return response
 
+@app.route("/api/jobs", methods=["POST"])
+def create_job():
+    payload = request.get_json(silent=True) or request.form
+    language = payload.get("language", "python")
+    code = payload.get("code", "")
+    java_main_class = payload.get("java_main_class", "Main")
+    if language not in SUPPORTED_LANGUAGES:
+        return jsonify({"error": f"Unsupported language: {language}"}), 400
+    if not code.strip():
+        return jsonify({"error": "No code provided."}), 400
+    if request.is_json:
+        test_inputs = [str(value) for value in payload.get("test_inputs") or []]
+    elif language == "python":
+        test_inputs = read_test_inputs(payload, code, get_input_prompts(code))
+    else:
+        test_inputs = []
+    job = job_queue.submit(language, code, test_inputs, java_main_class)
+    if job is None:
+        response = jsonify({"error": "Job queue is full. Please retry later.", "queue_depth": job_queue.depth(language)})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(JOB_RETRY_AFTER)
+        return response
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return response
+
+@app.route("/api/jobs/<job_id>")
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found."}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/api/test_suite", methods=["POST"])
+def test_suite():
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Expected a JSON body."}), 400
+    language = payload.get("language", "python")
+    code = payload.get("code", "")
+    cases = payload.get("cases")
+    if language not in SUPPORTED_LANGUAGES:
+        return jsonify({"error": f"Unsupported language: {language}"}), 400
+    if not code.strip():
+        return jsonify({"error": "No code provided."}), 400
+    if not isinstance(cases, list) or not cases or not all(isinstance(case, dict) for case in cases):
+        return jsonify({"error": "Provide a non-empty list of cases, each with an input and optional expected output."}), 400
+    result = {"language": language}
+    if payload.get("fix", True):
+        with timed("gemini", language):
+            fixed_code, explanation = fix_code_with_gemini(code, language)
+        if fixed_code.startswith("❌"):
+            return jsonify({"error": fixed_code}), 502
+        result.update(fixed_code=fixed_code, explanation=explanation)
+        code = fixed_code
+    with timed("test_suite", language):
+        result["suite"] = run_test_suite(code, language, cases, payload.get("java_main_class", "Main"),
+                                         clean=payload.get("fix", True))
+    return jsonify(result)
+
+@app.route("/run_live", methods=["POST"])
+def run_live():
+    language = request.form.get("language", "python")
+    code = request.form.get("code", "")
+    entry = LANGUAGES.get(language)
+    if entry is None or entry.builder is None:
+        return jsonify({"error": f"❌ Live runs are not supported for {language}."}), 400
+    if not code.strip():
+        return jsonify({"error": "No code provided."}), 400
+    run = live_runs.create(language)
+    if run is None:
+        response = jsonify({"error": "❌ Too many live runs in progress. Try again shortly."})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(LIVE_RUN_RETRY_AFTER)
+        return response
+    response = Response(stream_with_context(stream_live_run(run, code, request.form.get("java_main_class", "Main"))),
+                        mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.route("/run_live/<run_id>/stdin", methods=["POST"])
+def run_live_stdin(run_id):
+    run = live_runs.get(run_id)
+    if run is None:
+        return jsonify({"error": "Run not found."}), 404
+    payload = request.get_json(silent=True) or request.form
+    data = payload.get("data", "")
+    if len(data) > EXEC_OUTPUT_LIMIT:
+        return jsonify({"error": f"Input is limited to {EXEC_OUTPUT_LIMIT} characters per request."}), 413
+    if data and not run.send_input(data):
+        return jsonify({"error": "The program is no longer running."}), 409
+    if payload.get("eof") in (True, "1", "true"):
+        run.close_input()
+    return jsonify({"ok": True})
+
+@app.route("/run_live/<run_id>/cancel", methods=["POST"])
+def run_live_cancel(run_id):
+    run = live_runs.get(run_id)
+    if run is None:
+        return jsonify({"error": "Run not found."}), 404
+    run.cancel()
+    return jsonify({"cancelled": True})
+
+@app.route("/api/profile", methods=["POST"])
+def profile():
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Expected a JSON body."}), 400
+    language = payload.get("language", "python")
+    code = payload.get("code", "")
+    test_inputs = payload.get("test_inputs") or []
+    if language not in SUPPORTED_LANGUAGES:
+        return jsonify({"error": f"Unsupported language: {language}"}), 400
+    if not code.strip():
+        return jsonify({"error": "No code provided."}), 400
+    if not isinstance(test_inputs, list):
+        return jsonify({"error": "test_inputs must be a list of lines."}), 400
+    report = profile_code(code, language, [str(line) for line in test_inputs], payload.get("java_main_class", "Main"))
+    result = {"language": language, "profile": report}
+    if "error" in report or not payload.get("optimize", True):
+        return jsonify(result)
+    with timed("gemini", language):
+        fixed_code, explanation = optimize_code_with_gemini(code, language, report)
+    if fixed_code.startswith("❌"):
+        result["error"] = fixed_code
+        return jsonify(result), 502
+    result_id = result_store.save({"language": language, "fixed_code": fixed_code, "explanation": explanation})
+    result.update(id=result_id, fixed_code=fixed_code, explanation=explanation, diff=fix_diff(code, fixed_code))
+    return jsonify(result)
+
+@app.route("/api/benchmark", methods=["POST"])
+def benchmark():
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Expected a JSON body."}), 400
+    language = payload.get("language", "python")
+    code = payload.get("code", "")
+    test_inputs = payload.get("test_inputs") or []
+    if language not in SUPPORTED_LANGUAGES:
+        return jsonify({"error": f"Unsupported language: {language}"}), 400
+    if not code.strip():
+        return jsonify({"error": "No code provided."}), 400
+    if not isinstance(test_inputs, list):
+        return jsonify({"error": "test_inputs must be a list of lines."}), 400
+    try:
+        runs = int(payload.get("runs", BENCHMARK_RUNS))
+        warmup = int(payload.get("warmup", BENCHMARK_WARMUP))
+    except (TypeError, ValueError):
+        return jsonify({"error": "runs and warmup must be integers."}), 400
+    result = {"language": language}
+    fixed_code = payload.get("fixed_code")
+    if not fixed_code:
+        with timed("gemini", language):
+            fixed_code, explanation = fix_code_with_gemini(code, language)
+        if fixed_code.startswith("❌"):
+            return jsonify({"error": fixed_code}), 502
+        result.update(fixed_code=fixed_code, explanation=explanation)
+    with timed("benchmark", language):
+        result["benchmark"] = run_benchmark(code, fixed_code, language, [str(line) for line in test_inputs],
+                                            payload.get("java_main_class", "Main"), runs, warmup)
+    return jsonify(result)
+
+@app.route("/api/languages")
+def list_languages():
+    return jsonify([language.describe() for language in LANGUAGES.values()])
+
+@app.route("/cache_stats")
+def cache_stats():
+    return jsonify({"fix_cache": fix_cache.stats(), "artifact_cache": artifact_cache.stats(),
+                    "coalescing": {"fix": fix_flight.stats(), "execution": execution_flight.stats()}})
+
 @app.route("/send_chat_message", methods=["POST"])
 def send_chat_message():
     user_message = request.form.get("message")
@@ -1795,13 +5472,7 @@ def send_chat_message():
         return jsonify({"response": "Error: No message or image provided."}), 400
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash",
-                                     safety_settings={
-                                         HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                                         HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                                         HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                                         HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                                     })
+        model = model_registry.get("chat")
 
         parts = []
         if user_message:
@@ -1812,66 +5483,26 @@ def send_chat_message():
             img = Image.open(io.BytesIO(image_data))
             parts.append(img)
 
-        response = _gemini_api_call_with_retries(model.generate_content, parts)
+        with timed("gemini", "chat"):
+            response = _gemini_api_call_with_retries(model.generate_content, parts)
         ai_response = response.text
 
         return jsonify({"response": ai_response})
+    except CircuitOpenError as e:
+        response = jsonify({"response": f"I'm sorry, {e}"})
+        response.headers["Retry-After"] = str(int(GEMINI_BREAKER_RESET))
+        return response, 503
     except Exception as e:
         print(f"Error in AI chat response: {e}")
         return jsonify({"response": f"I'm sorry, I couldn't process that. Please try again. ({e})"}), 500
 
 if __name__ == "__main__":
     print("Checking for external tools:")
-    try:
-        subprocess.run(['java', '-version'], capture_output=True, text=True, check=True)
-        print("✅ Java is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Java not found. Java/Kotlin execution will not work.")
-    try:
-        subprocess.run(['kotlinc', '-version'], capture_output=True, text=True, check=True)
-        print("✅ Kotlin is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Kotlin not found. Kotlin compilation will not work.")
-    try:
-        subprocess.run(['g++', '--version'], capture_output=True, text=True, check=True)
-        print("✅ g++ is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ g++ not found. C++ compilation will not work.")
-    try:
-        subprocess.run(['go', 'version'], capture_output=True, text=True, check=True)
-        print("✅ Go is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Go not found. Go execution will not work.")
-    try:
-        subprocess.run(['rustc', '--version'], capture_output=True, text=True, check=True)
-        print("✅ Rust is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Rust not found. Rust compilation will not work.")
-    try:
-        subprocess.run(['ruby', '-v'], capture_output=True, text=True, check=True)
-        print("✅ Ruby is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Ruby not found. Ruby execution will not work.")
-    try:
-        subprocess.run(['arduino-cli', 'version'], capture_output=True, text=True, check=True)
-        print("✅ Arduino CLI is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Arduino CLI not found. Arduino compilation will not work.")
-    try:
-        subprocess.run(['iverilog', '-v'], capture_output=True, text=True, check=True)
-        print("✅ Icarus Verilog is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Icarus Verilog not found. Verilog/SystemVerilog/UVM compilation will not work.")
-    try:
-        subprocess.run(['node', '-v'], capture_output=True, text=True, check=True)
-        print("✅ Node.js is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Node.js not found. JavaScript/TypeScript execution will not work.")
-    try:
-        subprocess.run(['tsc', '-v'], capture_output=True, text=True, check=True)
-        print("✅ TypeScript compiler (tsc) is installed.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ TypeScript compiler (tsc) not found. TypeScript compilation will not work.")
+    for toolchain in TOOLCHAINS.values():
+        if toolchain.probe():
+            print(f"✅ {toolchain.label} is installed.")
+        else:
+            print(f"⚠️ {toolchain.label} not found. {toolchain.missing}")
 
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=True)
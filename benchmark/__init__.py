@@ -0,0 +1,2 @@
+from .fake_gemini import FakeGenerativeModel, install_fake_gemini
+from .corpus import CORPUS, snippets_for
@@ -0,0 +1,134 @@
+CORPUS = [
+    {
+        "language": "python",
+        "comment": "# {}",
+        "buggy": "def add(a, b)\n    return a + b\nprint(add(2, 3))",
+        "fixed": "def add(a, b):\n    return a + b\nprint(add(2, 3))",
+        "explanation": "Added the missing colon after the function signature.",
+    },
+    {
+        "language": "java",
+        "comment": "// {}",
+        "buggy": "public class Main {\n    public static void main(String[] args) {\n        System.out.println(\"Hello\")\n    }\n}",
+        "fixed": "public class Main {\n    public static void main(String[] args) {\n        System.out.println(\"Hello\");\n    }\n}",
+        "explanation": "Added the missing semicolon.",
+    },
+    {
+        "language": "cpp",
+        "comment": "// {}",
+        "buggy": "int main() {\n    std::cout << \"Hello\" << std::endl\n    return 0;\n}",
+        "fixed": "#include <iostream>\nint main() {\n    std::cout << \"Hello\" << std::endl;\n    return 0;\n}",
+        "explanation": "Included <iostream> and added the missing semicolon.",
+    },
+    {
+        "language": "go",
+        "comment": "// {}",
+        "buggy": "package main\nfunc main() {\n    fmt.Println(\"Hello\")\n}",
+        "fixed": "package main\n\nimport \"fmt\"\n\nfunc main() {\n    fmt.Println(\"Hello\")\n}",
+        "explanation": "Imported the fmt package.",
+    },
+    {
+        "language": "rust",
+        "comment": "// {}",
+        "buggy": "fn main() {\n    let s = String::from(\"hi\");\n    let t = s;\n    println!(\"{} {}\", s, t);\n}",
+        "fixed": "fn main() {\n    let s = String::from(\"hi\");\n    let t = s.clone();\n    println!(\"{} {}\", s, t);\n}",
+        "explanation": "Cloned the string instead of moving it.",
+    },
+    {
+        "language": "ruby",
+        "comment": "# {}",
+        "buggy": "def greet(name)\n  puts \"Hello, #{name}\"\ngreet(\"Ruby\")",
+        "fixed": "def greet(name)\n  puts \"Hello, #{name}\"\nend\ngreet(\"Ruby\")",
+        "explanation": "Closed the method with end.",
+    },
+    {
+        "language": "kotlin",
+        "comment": "// {}",
+        "buggy": "fun main() {\n    val x: Int = \"5\"\n    println(x)\n}",
+        "fixed": "fun main() {\n    val x: Int = 5\n    println(x)\n}",
+        "explanation": "Assigned an Int literal instead of a String.",
+    },
+    {
+        "language": "arduino",
+        "comment": "// {}",
+        "buggy": "void setup() {\n  pinMode(13, OUTPUT)\n}\nvoid loop() {\n  digitalWrite(13, HIGH);\n}",
+        "fixed": "void setup() {\n  pinMode(13, OUTPUT);\n}\nvoid loop() {\n  digitalWrite(13, HIGH);\n}",
+        "explanation": "Added the missing semicolon.",
+    },
+    {
+        "language": "verilog",
+        "comment": "// {}",
+        "buggy": "module tb;\n  initial begin\n    $display(\"Hello\")\n  end\nendmodule",
+        "fixed": "module tb;\n  initial begin\n    $display(\"Hello\");\n  end\nendmodule",
+        "explanation": "Added the missing semicolon.",
+    },
+    {
+        "language": "systemverilog",
+        "comment": "// {}",
+        "buggy": "module tb;\n  logic [3:0] a\n  initial begin\n    a = 4'd3;\n    $display(\"%0d\", a);\n  end\nendmodule",
+        "fixed": "module tb;\n  logic [3:0] a;\n  initial begin\n    a = 4'd3;\n    $display(\"%0d\", a);\n  end\nendmodule",
+        "explanation": "Added the missing semicolon after the declaration.",
+    },
+    {
+        "language": "uvm",
+        "comment": "// {}",
+        "buggy": "class my_test extends uvm_test\n  `uvm_component_utils(my_test)\nendclass",
+        "fixed": "class my_test extends uvm_test;\n  `uvm_component_utils(my_test)\n  function new(string name, uvm_component parent);\n    super.new(name, parent);\n  endfunction\nendclass",
+        "explanation": "Added the missing semicolon and constructor.",
+    },
+    {
+        "language": "javascript",
+        "comment": "// {}",
+        "buggy": "const nums = [1, 2, 3];\nconsole.log(nums.map(n => n * 2).joins(','));",
+        "fixed": "const nums = [1, 2, 3];\nconsole.log(nums.map(n => n * 2).join(','));",
+        "explanation": "Replaced joins with join.",
+    },
+    {
+        "language": "typescript",
+        "comment": "// {}",
+        "buggy": "function square(n: number): number {\n  return n * n\n}\nconsole.log(square(\"4\"));",
+        "fixed": "function square(n: number): number {\n  return n * n;\n}\nconsole.log(square(4));",
+        "explanation": "Passed a number instead of a string.",
+    },
+    {
+        "language": "sql",
+        "comment": "-- {}",
+        "buggy": "CREATE TABLE users (id INTEGER, name TEXT);\nINSERT INTO users VALUES (1, 'Ada');\nSELEC * FROM users;",
+        "fixed": "CREATE TABLE users (id INTEGER, name TEXT);\nINSERT INTO users VALUES (1, 'Ada');\nSELECT * FROM users;",
+        "explanation": "Fixed the SELECT keyword.",
+    },
+    {
+        "language": "html",
+        "comment": "<!-- {} -->",
+        "buggy": "<!DOCTYPE html>\n<html>\n<body>\n<h1>Hello</h2>\n</body>\n</html>",
+        "fixed": "<!DOCTYPE html>\n<html>\n<body>\n<h1>Hello</h1>\n</body>\n</html>",
+        "explanation": "Closed the heading with the matching tag.",
+    },
+    {
+        "language": "css",
+        "comment": "/* {} */",
+        "buggy": "body {\n  color: red\n  background: white;\n}",
+        "fixed": "body {\n  color: red;\n  background: white;\n}",
+        "explanation": "Added the missing semicolon.",
+    },
+    {
+        "language": "django",
+        "comment": "# {}",
+        "buggy": "from django.db import models\nclass Post(models.Model):\n    title = models.CharField()",
+        "fixed": "from django.db import models\n\nclass Post(models.Model):\n    title = models.CharField(max_length=200)",
+        "explanation": "CharField requires max_length.",
+    },
+    {
+        "language": "react",
+        "comment": "// {}",
+        "buggy": "import React from 'react';\nfunction App() {\n  return <div>Hello<div>;\n}\nexport default App;",
+        "fixed": "import React from 'react';\nfunction App() {\n  return <div>Hello</div>;\n}\nexport default App;",
+        "explanation": "Closed the div element.",
+    },
+]
+
+
+def snippets_for(languages=None):
+    if not languages:
+        return list(CORPUS)
+    return [snippet for snippet in CORPUS if snippet["language"] in languages]
@@ -0,0 +1,66 @@
+import random
+import time
+
+from .corpus import CORPUS
+
+CHAT_REPLY = "This is a canned reply from the benchmark Gemini stand-in."
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChat:
+    def __init__(self, model):
+        self.model = model
+
+    def send_message(self, prompt, **kwargs):
+        return self.model.generate_content(prompt, **kwargs)
+
+
+class FakeGenerativeModel:
+    def __init__(self, model_name="gemini-1.5-flash", latency=0.5, jitter=0.1, stream_chunks=8, **kwargs):
+        self.model_name = model_name
+        self.latency = latency
+        self.jitter = jitter
+        self.stream_chunks = stream_chunks
+        self.calls = 0
+
+    def _delay(self):
+        return self.latency + random.uniform(0, self.jitter)
+
+    def _reply_for(self, prompt):
+        if not isinstance(prompt, str):
+            return CHAT_REPLY
+        for snippet in CORPUS:
+            if snippet["buggy"] in prompt:
+                return f"{snippet['fixed']}\n---EXPLANATION---\n{snippet['explanation']}"
+        return CHAT_REPLY
+
+    def start_chat(self, **kwargs):
+        return FakeChat(self)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        text = self._reply_for(prompt)
+        if stream:
+            return self._stream(text)
+        time.sleep(self._delay())
+        return FakeResponse(text)
+
+    def _stream(self, text):
+        size = max(len(text) // self.stream_chunks, 1)
+        delay = self._delay() / self.stream_chunks
+        for start in range(0, len(text), size):
+            time.sleep(delay)
+            yield FakeResponse(text[start:start + size])
+
+
+def install_fake_gemini(app_module, latency=0.5, jitter=0.1):
+    def factory(model_name="gemini-1.5-flash", **kwargs):
+        return FakeGenerativeModel(model_name, latency=latency, jitter=jitter)
+
+    app_module.genai.GenerativeModel = factory
+    app_module.model_registry.clear()
+    return factory
@@ -0,0 +1,176 @@
+import argparse
+import importlib
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .corpus import snippets_for
+from .fake_gemini import install_fake_gemini
+
+ENDPOINTS = ["/", "/download", "/send_chat_message"]
+CHAT_MESSAGE = "Explain what a race condition is in one sentence."
+
+
+def load_app(latency, jitter):
+    # Keep benchmark caches and results away from the real ones.
+    workdir = tempfile.mkdtemp(prefix="ai-debugger-bench-")
+    os.environ.setdefault("FIX_CACHE_PATH", os.path.join(workdir, "fix_cache.db"))
+    os.environ.setdefault("RESULT_STORE_PATH", os.path.join(workdir, "results.db"))
+    os.environ.setdefault("ARTIFACT_CACHE_DIR", os.path.join(workdir, "artifacts"))
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    app_module = importlib.import_module("app")
+    install_fake_gemini(app_module, latency=latency, jitter=jitter)
+    return app_module
+
+
+class InProcessClient:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = self.flask_app.test_client()
+        return self._local.client
+
+    def get(self, path):
+        response = self._client().get(path)
+        return response.status_code, response.get_data(as_text=True)
+
+    def post(self, path, data):
+        response = self._client().post(path, data=data)
+        return response.status_code, response.get_data(as_text=True)
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self._requests = requests
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = self._requests.Session()
+        return self._local.session
+
+    def get(self, path):
+        response = self._session().get(self.base_url + path, timeout=120)
+        return response.status_code, response.text
+
+    def post(self, path, data):
+        response = self._session().post(self.base_url + path, data=data, timeout=120)
+        return response.status_code, response.text
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def snippet_code(snippet, unique_id=None):
+    if unique_id is None:
+        return snippet["buggy"]
+    return snippet["buggy"] + "\n" + snippet["comment"].format(f"benchmark run {unique_id}")
+
+
+def prime_download_id(client, snippet):
+    status, body = client.post("/", {"language": snippet["language"], "code": snippet["buggy"]})
+    match = re.search(r"download\?id=(\w+)", body)
+    if status != 200 or not match:
+        raise RuntimeError("Could not obtain a result id for /download.")
+    return match.group(1)
+
+
+def send(client, endpoint, snippet, index, unique, download_id):
+    if endpoint == "/":
+        code = snippet_code(snippet, index if unique else None)
+        return client.post("/", {"language": snippet["language"], "code": code})
+    if endpoint == "/download":
+        return client.get(f"/download?id={download_id}")
+    return client.post("/send_chat_message", {"message": CHAT_MESSAGE})
+
+
+def run_endpoint(client, endpoint, snippets, total, concurrency, unique, download_id=None):
+    def one(index):
+        snippet = snippets[index % len(snippets)]
+        started = time.perf_counter()
+        try:
+            status, _ = send(client, endpoint, snippet, index, unique, download_id)
+        except Exception:
+            status = None
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+    latencies = [elapsed for elapsed, status in results if status is not None and status < 400]
+    return {
+        "endpoint": endpoint,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": total - len(latencies),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+    }
+
+
+def format_table(rows):
+    header = f"{'endpoint':<20} {'reqs':>6} {'conc':>5} {'errors':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['endpoint']:<20} {row['requests']:>6} {row['concurrency']:>5} {row['errors']:>6} "
+            f"{row['mean_ms']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['throughput_rps']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the AI Code Debugger.")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app.")
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS, choices=ENDPOINTS)
+    parser.add_argument("--languages", nargs="+", help="Restrict the corpus to these languages.")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake Gemini latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Extra random fake Gemini latency in seconds.")
+    parser.add_argument("--unique", action="store_true", help="Make every snippet unique to bypass the fix cache.")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    snippets = snippets_for(args.languages)
+    if not snippets:
+        raise SystemExit("No corpus snippets match the requested languages.")
+    if args.url:
+        client = HttpClient(args.url)
+    else:
+        client = InProcessClient(load_app(args.latency, args.jitter).app)
+    download_id = prime_download_id(client, snippets[0]) if "/download" in args.endpoints else None
+    rows = [run_endpoint(client, endpoint, snippets, args.requests, args.concurrency, args.unique, download_id)
+            for endpoint in args.endpoints]
+    print(format_table(rows))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import re
+import statistics
+import time
+
+from .corpus import CORPUS
+from .load import load_app
+
+
+def legacy_preprocess_code(code):
+    # The multi-pass implementation preprocess_code replaced, kept for comparison.
+    code = re.sub(r'```(python|java|cpp|go|rust|ruby|kotlin|arduino|verilog|systemverilog|uvm|javascript|typescript|html|css|django|react|sql)\s*', '', code, flags=re.IGNORECASE)
+    code = code.replace("```", "")
+    code = code.replace("\t", "    ")
+    code = re.sub(r'[^\x00-\x7F]+', '', code)
+    code = re.sub(r'^\s*\.\.\..*$', '', code, flags=re.MULTILINE)
+    return code.strip()
+
+
+def make_input(lines, fenced, pasted):
+    body = []
+    for index in range(lines):
+        snippet = CORPUS[index % len(CORPUS)]
+        body.extend(snippet["fixed"].split("\n"))
+        if pasted and index % 10 == 0:
+            body.append("\tmessage = “naïve café”  # copied from a doc")
+        if len(body) >= lines:
+            break
+    code = "\n".join(body[:lines])
+    if fenced:
+        return f"Here is the corrected code:\n```python\n{code}\n```\nThe explanation follows."
+    return code
+
+
+def time_call(func, code, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(code)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def run(sizes, repeat):
+    app_module = load_app(latency=0, jitter=0)
+    rows = []
+    for lines in sizes:
+        for label, fenced, pasted in (("fenced", True, True), ("pasted", False, True), ("plain", False, False)):
+            code = make_input(lines, fenced, pasted)
+            row = {
+                "input": f"{lines} lines, {label}",
+                "bytes": len(code.encode("utf-8")),
+                "legacy_ms": round(time_call(legacy_preprocess_code, code, repeat) * 1000, 3),
+                "current_ms": round(time_call(app_module.preprocess_code, code, repeat) * 1000, 3),
+                "skip_ms": round(time_call(lambda c: app_module.preprocess_code(c, clean=True), code, repeat) * 1000, 3),
+            }
+            rows.append(row)
+    return rows
+
+
+def format_table(rows):
+    header = f"{'input':<24} {'bytes':>10} {'legacy ms':>10} {'current ms':>11} {'clean=True ms':>14}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(f"{row['input']:<24} {row['bytes']:>10} {row['legacy_ms']:>10} {row['current_ms']:>11} {row['skip_ms']:>14}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark preprocess_code on large inputs.")
+    parser.add_argument("--lines", nargs="+", type=int, default=[1000, 10000, 100000], help="Input sizes in lines.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per input; the median is reported.")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+    rows = run(args.lines, args.repeat)
+    print(format_table(rows))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import argparse
+import os
+
+from .load import load_app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AI Code Debugger against the fake Gemini backend.")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5001)))
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    app_module = load_app(args.latency, args.jitter)
+    app_module.app.run(host="127.0.0.1", port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()